@@ -0,0 +1,468 @@
+# benchmarks/load_test.py
+# Load test for the portal: seed a scratch MySQL/MariaDB database with
+# synthetic data, drive the main routes concurrently and report throughput
+# and latency percentiles as JSON.
+#
+#   python benchmarks/load_test.py --database portal_bench --users 2000 \
+#       --concurrency 8 --requests 400 --json results/before.json
+#   python benchmarks/load_test.py --database portal_bench --skip-seed \
+#       --compare results/before.json --json results/after.json
+#
+# Requests go through the Flask test client in this process (one client per
+# thread), so the numbers cover app.py + MySQL and leave out the HTTP server.
+# Google Scholar is replaced by scholar_fetch.FakeScholarly; imports queued by
+# /user/update_publications are drained by in-process worker threads and
+# timed as the "scholar_import" scenario. Seeding drops and recreates
+# --database, so it refuses to touch the database named in config.py.
+import argparse
+import concurrent.futures
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402  (must be patched before app is imported)
+from sql_metrics import percentile  # noqa: E402
+
+EMAIL_DOMAIN = "bench.example"
+PASSWORD = "bench-password"
+REPORT_TYPES = ("publications", "patents", "commercializations")
+DYNAMIC_TYPES = ("text", "int", "date", "float", "bool")
+WORDS = ("adaptive", "graph", "learning", "sensor", "network", "protein", "thermal", "quantum",
+         "robust", "model", "analysis", "framework", "energy", "control", "imaging", "data")
+
+portal = None  # the app module, imported once the database is configured
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------
+# Seeding
+# ---------------------------
+def phrase(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def dynamic_value(rng, field_type):
+    if field_type == "int":
+        return rng.randint(0, 10000)
+    if field_type == "float":
+        return round(rng.uniform(0, 1000), 2)
+    if field_type == "bool":
+        return rng.randint(0, 1)
+    if field_type == "date":
+        return datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randint(0, 9000))
+    return phrase(rng, 3)
+
+
+def insert_batches(cursor, conn, sql, rows, batch_size=1000):
+    for i in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[i:i + batch_size])
+        conn.commit()
+
+
+def create_dynamic_fields(args):
+    """Add dynamic columns through /admin/add_column, like an admin would."""
+    fields = {table: [] for table in ("patents", "commercializations")}
+    client = portal.app.test_client()
+    with client.session_transaction() as sess:
+        sess["role"] = "admin"
+    for table in fields:
+        for i in range(args.dynamic_fields):
+            field_type = DYNAMIC_TYPES[i % len(DYNAMIC_TYPES)]
+            name = f"bench_{field_type}_{i}"
+            client.post("/admin/add_column", data={
+                "table_name": table, "field_name": name, "storage": args.field_storage,
+                "field_label": name.replace("_", " ").title(), "field_type": field_type})
+            fields[table].append((name, field_type))
+    # the ALTERs are queued (and already picked up by the runner the POSTs
+    # started); every field must be built and registered before seeding rows
+    failed = portal.wait_for_schema_changes()
+    if failed:
+        raise SystemExit(f"Schema changes failed while creating dynamic fields: {failed}")
+    for table, created in fields.items():
+        registered = {f["field_name"] for f in portal.get_dynamic_fields(table, map_for_form=False)}
+        missing = [name for name, _ in created if name not in registered]
+        if missing:
+            raise SystemExit(f"Dynamic fields not registered on {table}: {', '.join(missing)}")
+    return fields
+
+
+def seed(args):
+    import mysql.connector
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(args.seed)
+    server = mysql.connector.connect(**{k: v for k, v in config.MYSQL_CONFIG.items() if k != "database"})
+    cursor = server.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+    cursor.execute(f"CREATE DATABASE `{args.database}` CHARACTER SET utf8mb4")
+    cursor.close()
+    server.close()
+
+    portal.ensure_base_tables()
+    dynamic = create_dynamic_fields(args)
+
+    started = time.perf_counter()
+    conn = portal.get_db()
+    cursor = conn.cursor()
+
+    insert_batches(cursor, conn, "INSERT INTO departments (name) VALUES (%s)",
+                   [(f"Department {i:03d}",) for i in range(1, args.departments + 1)])
+
+    # one hash for everyone: hashing thousands of passwords would dominate the seed
+    password = generate_password_hash(PASSWORD)
+    users = [("Bench Admin", f"admin@{EMAIL_DOMAIN}", password, "admin", None)]
+    users += [(f"{phrase(rng, 1)} User {i}", f"user{i}@{EMAIL_DOMAIN}", password, "user",
+               rng.randint(1, args.departments))
+              for i in range(1, args.users + 1)]
+    insert_batches(cursor, conn, """INSERT INTO users_new (name, email, password, role, department_id)
+                                    VALUES (%s, %s, %s, %s, %s)""", users)
+    cursor.execute("SELECT id FROM users_new WHERE role='user'")
+    user_ids = [row[0] for row in cursor.fetchall()]
+
+    publications, patents, commercializations = [], [], []
+    for user_id in user_ids:
+        for _ in range(rng.randint(0, 2 * args.publications)):
+            title = phrase(rng, rng.randint(4, 10))
+            year = str(rng.randint(1995, 2025))
+            publications.append((user_id, title, "A. Author and B. Author", year,
+                                 portal.pub_year_value(year), portal.title_hash(title),
+                                 str(rng.randint(0, 500))))
+        for _ in range(rng.randint(0, 2 * args.patents)):
+            patents.append(((user_id, phrase(rng, 5), "A. Inventor"),
+                            {name: dynamic_value(rng, t) for name, t in dynamic["patents"]}))
+        for _ in range(rng.randint(0, 2 * args.commercializations)):
+            commercializations.append(((user_id, phrase(rng, 3)),
+                                       {name: dynamic_value(rng, t) for name, t in dynamic["commercializations"]}))
+
+    insert_batches(cursor, conn, """INSERT INTO publications
+                                        (user_id, title, authors, year, pub_year, title_hash, citations)
+                                    VALUES (%s, %s, %s, %s, %s, %s, %s)""", publications)
+    for table, base, rows in (("patents", ["user_id", "title", "inventors"], patents),
+                              ("commercializations", ["user_id", "project_name"], commercializations)):
+        # dynamic values go wherever the field is stored (own column or extra_fields)
+        fields = portal.get_dynamic_fields(table, map_for_form=False)
+        rows = [(base_values, portal.dynamic_insert_values(fields, values)) for base_values, values in rows]
+        cols = base + (list(rows[0][1]) if rows else [])
+        insert_batches(cursor, conn,
+                       f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in cols)}) "
+                       f"VALUES ({', '.join(['%s'] * len(cols))})",
+                       [base_values + tuple(dyn.values()) for base_values, dyn in rows])
+    cursor.close()
+    conn.close()
+    portal.rebuild_stats()  # rows went in behind the app's back
+
+    counts = {"departments": args.departments, "users": len(user_ids), "publications": len(publications),
+              "patents": len(patents), "commercializations": len(commercializations),
+              "dynamic_fields_per_table": args.dynamic_fields, "field_storage": args.field_storage}
+    print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return counts
+
+
+def bench_user_emails():
+    conn = portal.get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT email FROM users_new WHERE role='user' AND email LIKE %s ORDER BY id",
+                   (f"%@{EMAIL_DOMAIN}",))
+    emails = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    return emails
+
+
+# ---------------------------
+# Scenarios: (role to log in as, request function) -> response
+# ---------------------------
+def login(client, role, email):
+    return client.post(f"/login?role={role}", data={"email": email, "password": PASSWORD})
+
+
+def scenario_login(client, rng, ctx):
+    resp = login(client, "user", rng.choice(ctx["emails"]))
+    ok = resp.status_code == 302 and "dashboard" in resp.headers.get("Location", "")
+    return resp, ok
+
+
+def scenario_get(path):
+    def run(client, rng, ctx):
+        resp = client.get(path)
+        return resp, resp.status_code == 200
+    return run
+
+
+def scenario_update_publications(client, rng, ctx):
+    resp = client.post("/user/update_publications",
+                       data={"scholar_link": f"https://scholar.google.com/citations?user=bench{rng.randint(1, 10 ** 6)}"},
+                       headers={"Accept": "application/json"})
+    return resp, resp.status_code == 202
+
+
+def build_scenarios():
+    scenarios = {
+        "login": (None, scenario_login),
+        "user_dashboard": ("user", scenario_get("/user/dashboard")),
+        "admin_dashboard": ("admin", scenario_get("/admin_dashboard")),
+    }
+    for report_type in REPORT_TYPES:
+        scenarios[f"admin_download_{report_type}"] = ("admin", scenario_get(f"/admin/download/{report_type}"))
+    scenarios["update_publications"] = ("user", scenario_update_publications)
+    return scenarios
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+def summarize(latencies, errors, elapsed):
+    ms = sorted(x * 1000 for x in latencies)
+
+    def r(x):
+        return None if x is None else round(x, 2)
+
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(ms) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": r(sum(ms) / len(ms)) if ms else None,
+            "p50": r(percentile(ms, 50)),
+            "p90": r(percentile(ms, 90)),
+            "p95": r(percentile(ms, 95)),
+            "p99": r(percentile(ms, 99)),
+            "max": r(ms[-1]) if ms else None,
+        },
+    }
+
+
+def run_scenario(role, request_fn, ctx, total, concurrency, warmup, seed):
+    def worker(index, count):
+        rng = random.Random(seed * 1000 + index)
+        client = portal.app.test_client()
+        if role == "admin":
+            login(client, role, f"admin@{EMAIL_DOMAIN}")
+        elif role is not None:
+            login(client, role, rng.choice(ctx["emails"]))
+        for _ in range(warmup):
+            resp, _ = request_fn(client, rng, ctx)
+            resp.get_data()
+            resp.close()
+        barrier.wait()
+
+        latencies, errors = [], 0
+        for _ in range(count):
+            start = time.perf_counter()
+            resp, ok = request_fn(client, rng, ctx)
+            resp.get_data()  # drain streamed bodies (CSV downloads)
+            resp.close()
+            latencies.append(time.perf_counter() - start)
+            errors += 0 if ok else 1
+        return latencies, errors
+
+    counts = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, i, n) for i, n in enumerate(counts)]
+        barrier.wait()  # everyone logged in and warmed up
+        started = time.perf_counter()
+        results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - started
+
+    latencies = [x for lat, _ in results for x in lat]
+    return summarize(latencies, sum(e for _, e in results), elapsed)
+
+
+def run_cold_download(report_type):
+    """First download after a change: builds the snapshot instead of serving it."""
+    client = portal.app.test_client()
+    with client.session_transaction() as sess:
+        sess["role"] = "admin"
+    start = time.perf_counter()
+    resp = client.get(f"/admin/download/{report_type}")
+    resp.get_data()
+    resp.close()
+    return summarize([time.perf_counter() - start], 0 if resp.status_code == 200 else 1,
+                     time.perf_counter() - start)
+
+
+def drain_imports(workers, timeout):
+    """Run import workers until the queue is empty; time each job."""
+    import jobs
+
+    durations = []
+    lock = threading.Lock()
+
+    def timed_handler(job, progress):
+        start = time.perf_counter()
+        try:
+            portal.import_scholar_publications(job, progress)
+        finally:
+            with lock:
+                durations.append(time.perf_counter() - start)
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=jobs.run_worker, daemon=True,
+                                args=(portal.get_db, timed_handler, portal.app.logger),
+                                kwargs={"poll_interval": 0.05, "stop": stop})
+               for _ in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        conn = portal.get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM import_jobs WHERE status IN ('queued', 'running')")
+        pending = cursor.fetchone()[0]
+        cursor.close()
+        conn.close()
+        if not pending:
+            break
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for t in threads:
+        t.join()
+
+    conn = portal.get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM import_jobs WHERE status <> 'done'")
+    not_done = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return summarize(durations, not_done, elapsed)
+
+
+def compare(previous, current):
+    print(f"{'scenario':32} {'p95 ms':>21} {'rps':>21}")
+    for name, now in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+
+        def fmt(old, new):
+            if old is None or new is None:
+                return "n/a"
+            change = f"{(new - old) / old * 100:+.0f}%" if old else ""
+            return f"{old:.1f} -> {new:.1f} {change}"
+
+        print(f"{name:32} {fmt(before['latency_ms']['p95'], now['latency_ms']['p95']):>21} "
+              f"{fmt(before['throughput_rps'], now['throughput_rps']):>21}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a scratch database and load-test the portal routes.")
+    parser.add_argument("--database", default="innovation_portal_bench",
+                        help="scratch database (dropped and recreated when seeding)")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in --database")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and request mix")
+    scale = parser.add_argument_group("scale")
+    scale.add_argument("--departments", type=int, default=20)
+    scale.add_argument("--users", type=int, default=1000)
+    scale.add_argument("--publications", type=int, default=30, help="average per user")
+    scale.add_argument("--patents", type=int, default=3, help="average per user")
+    scale.add_argument("--commercializations", type=int, default=2, help="average per user")
+    scale.add_argument("--dynamic-fields", type=int, default=5, help="per table")
+    scale.add_argument("--field-storage", choices=("column", "json"), default="column",
+                       help="storage mode for the dynamic fields")
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    load.add_argument("--warmup", type=int, default=2, help="unmeasured requests per thread")
+    load.add_argument("--scenarios", help="comma-separated subset (default: all)")
+    load.add_argument("--import-workers", type=int, default=4)
+    load.add_argument("--import-timeout", type=float, default=600.0)
+    load.add_argument("--scholar-publications", type=int, default=20, help="per fake author")
+    load.add_argument("--scholar-latency", type=float, default=0.02, help="seconds per fake Scholar call")
+    load.add_argument("--scholar-failure-rate", type=float, default=0.05)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    if args.database == config.MYSQL_CONFIG["database"] and not args.skip_seed:
+        parser.error("refusing to reseed the database configured in config.py; pick another --database")
+
+    # point the app at the scratch database before anything connects
+    config.MYSQL_CONFIG["database"] = args.database
+    config.POOL_CONFIG["pool_size"] = max(config.POOL_CONFIG["pool_size"], args.concurrency + args.import_workers)
+
+    global portal
+    import app as portal
+    from scholar_cache import MemoryScholarCache
+    from scholar_fetch import FakeScholarly
+
+    portal.app.config["SCHOLAR_BACKEND"] = FakeScholarly(
+        num_publications=args.scholar_publications, latency=args.scholar_latency,
+        failure_rate=args.scholar_failure_rate, seed=args.seed)
+    portal.app.config["SCHOLAR_CACHE"] = MemoryScholarCache()
+    portal.REPORT_SNAPSHOT_DIR = tempfile.mkdtemp(prefix="portal-bench-reports-")
+
+    counts = None if args.skip_seed else seed(args)
+    ctx = {"emails": bench_user_emails()}
+    if not ctx["emails"]:
+        parser.error(f"no seeded users in {args.database}; run without --skip-seed first")
+
+    scenarios = build_scenarios()
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios) + ["scholar_import"]
+    unknown = set(selected) - set(scenarios) - {"scholar_import"}
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in selected:
+        if name.startswith("admin_download_"):
+            results[f"{name}_cold"] = run_cold_download(name[len("admin_download_"):])
+        if name == "scholar_import":
+            results[name] = drain_imports(args.import_workers, args.import_timeout)
+        else:
+            role, request_fn = scenarios[name]
+            results[name] = run_scenario(role, request_fn, ctx, args.requests, args.concurrency,
+                                         args.warmup, args.seed)
+        print(f"{name}: {json.dumps(results[name]['latency_ms'])} "
+              f"{results[name]['throughput_rps']} rps, {results[name]['errors']} errors", file=sys.stderr)
+
+    output = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "database": args.database,
+            "seeded": counts,
+            "users_in_db": len(ctx["emails"]),
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+        "sql": portal.sql_stats.snapshot(top=20),
+        "pool": portal.get_pool().stats(),
+    }
+    print(json.dumps(output["scenarios"], indent=2))
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# benchmarks/startup_time.py
+# Cold-start benchmark: how long a fresh interpreter takes to import app.py
+# and build its URL map, i.e. what every gunicorn worker pays on boot.
+#
+#   python benchmarks/startup_time.py --runs 10 --target-ms 800
+#
+# Each run is a new process (nothing cached in sys.modules). Exits non-zero
+# when the median exceeds the target, so it can gate a CI job. Importing the
+# app must not need a database; if it does (or the import fails for any other
+# reason, e.g. a missing module), this stops at the first run with the error.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import time, json
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+with app.app.test_request_context("/"):
+    rules = len(list(app.app.url_map.iter_rules()))
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "boot_ms": (t2 - t0) * 1000, "rules": rules,
+                  "scholarly_loaded": "scholarly" in __import__("sys").modules}))
+"""
+
+
+class ProbeFailed(Exception):
+    """The probe process could not import / boot the app."""
+
+
+def run_once():
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        lines = out.stderr.strip().splitlines()
+        raise ProbeFailed(lines[-1] if lines else f"exit status {out.returncode}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import/boot time of app.py.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=800.0,
+                        help="fail if the median boot time is above this")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        samples = [run_once() for _ in range(args.runs)]
+    except ProbeFailed as e:
+        print(f"FAIL: could not import app, no measurement taken: {e}", file=sys.stderr)
+        return 2
+    boot = sorted(s["boot_ms"] for s in samples)
+    result = {
+        "runs": args.runs,
+        "import_ms_median": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "boot_ms_median": round(statistics.median(boot), 1),
+        "boot_ms_max": round(boot[-1], 1),
+        "target_ms": args.target_ms,
+        "scholarly_loaded": any(s["scholarly_loaded"] for s in samples),
+    }
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if result["scholarly_loaded"]:
+        print("FAIL: importing app pulled in scholarly", file=sys.stderr)
+        return 1
+    if result["boot_ms_median"] > args.target_ms:
+        print(f"FAIL: median boot {result['boot_ms_median']}ms > target {args.target_ms}ms",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,65 @@
+import os
+
 MYSQL_CONFIG = {
     "host": "localhost",
     "user": "root",         # your MySQL username
     "password": "root", # your MySQL password
     "database": "innovation_portal"
 }
+
+# Connection pool used by get_db()
+POOL_CONFIG = {
+    "pool_size": 5,        # connections kept open per worker process
+    "max_overflow": 10,    # extra connections allowed under burst load
+    "pool_timeout": 30,    # seconds to wait for a free connection
+    "pool_recycle": 3600,  # reconnect connections older than this (seconds)
+    "pre_ping": True       # ping idle connections on checkout
+}
+
+# Google Scholar fetch engine (scholar_fetch.ScholarFetcher)
+SCHOLAR_FETCH_CONFIG = {
+    "workers": 8,        # concurrent scholarly.fill() calls per author
+    "rate": 5.0,         # Scholar requests per second, shared by all workers
+    "burst": 5,
+    "retries": 3,        # retries per call on transient errors
+    "backoff": 0.5,      # first retry delay (seconds), doubled each attempt
+    "deadline": 120.0,   # per-author time budget; partial results after this
+    "heartbeat": 10.0    # seconds between import job heartbeats during a fetch
+}
+
+# Skip a Scholar sync if the same profile was fully synced this recently (seconds)
+SCHOLAR_SYNC_MIN_INTERVAL = 3600
+
+# On-disk cache for Scholar lookups (scholar_cache.ScholarCache)
+SCHOLAR_CACHE_CONFIG = {
+    "path": "instance/scholar_cache.sqlite3",
+    "max_bytes": 256 * 1024 * 1024,  # LRU eviction above this payload size
+    "author_ttl": 6 * 3600,          # author + publication list (citation counts)
+    "pub_ttl": 30 * 86400            # filled publication details
+}
+
+# SQL instrumentation (sql_metrics)
+SQL_METRICS_CONFIG = {
+    "slow_query_ms": 200,        # log statements slower than this, with their route
+    "slowest_per_request": 5,    # slowest statements kept per request (slow-request log)
+    "slow_request_db_ms": 1000,  # log requests whose SQL time exceeds this, with those statements
+    "samples": 1000,             # recent samples kept per route / statement for p50/p95
+    "max_statements": 500,       # distinct normalized statements tracked
+    "max_routes": 200            # distinct routes tracked
+}
+
+# Bearer token required by /metrics (Prometheus scrape config: authorization.credentials).
+# None leaves the endpoint open, e.g. when it is only reachable from the monitoring network.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Per-process cache of rendered user dashboard lists (see user_dashboard)
+DASHBOARD_CACHE_CONFIG = {
+    "max_users": 2000  # least recently viewed dashboards are dropped above this
+}
+
+# Default storage for new dynamic fields (the Add Field form can override it):
+#   "column" - one physical column per field, added by a background ALTER TABLE
+#   "json"   - a key in the table's extra_fields JSON column; adding it only
+#              writes metadata. Fields marked searchable get an indexed
+#              generated column either way.
+DYNAMIC_FIELD_STORAGE = "column"
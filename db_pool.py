@@ -0,0 +1,209 @@
+# db_pool.py
+# Small MySQL connection pool used by get_db() in app.py.
+#
+# mysql.connector ships its own pool, but it has no overflow, no recycle age
+# and no statistics, so we keep our own. Connections are handed out LIFO so
+# the warm ones get reused and the idle tail can age out.
+import collections
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection became free within pool_timeout seconds."""
+
+
+class ConnectionPool:
+    def __init__(self, connect_args, pool_size=5, max_overflow=10,
+                 pool_timeout=30.0, pool_recycle=3600, pre_ping=True, connect=None):
+        self.connect_args = dict(connect_args)
+        self.connect = connect or mysql.connector.connect  # tests pass a stub
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pre_ping = pre_ping
+        self.pid = os.getpid()
+
+        self._idle = collections.deque()  # (raw_conn, created_at)
+        self._open = 0                    # idle + checked out
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "recycled": 0,
+            "invalidated": 0,
+            "wait_time_total": 0.0,
+        }
+
+    # ---------------------------
+    # checkout / checkin
+    # ---------------------------
+    def acquire(self):
+        """Return (raw_conn, created_at). Blocks up to pool_timeout when the
+        pool and its overflow are exhausted."""
+        deadline = time.monotonic() + self.pool_timeout
+        waited_since = None
+        entry = None
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Connection pool exhausted ({self._open} open), "
+                        f"waited {self.pool_timeout}s")
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._stats["waits"] += 1
+                self._cond.wait(remaining)
+            if waited_since is not None:
+                self._stats["wait_time_total"] += time.monotonic() - waited_since
+
+        # connect / validate outside the lock so a slow server doesn't
+        # serialize every other checkout behind us
+        try:
+            if entry is not None:
+                entry = self._validate(entry)
+            if entry is None:
+                entry = self._new_connection()
+        except Exception:
+            self._discard_slot()
+            raise
+        return entry
+
+    def release(self, conn, created_at):
+        """Give a connection back. Any open transaction is rolled back so the
+        next request never inherits locks or a stale REPEATABLE READ snapshot."""
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            self._close_quietly(conn)
+            with self._cond:
+                self._stats["invalidated"] += 1
+            self._discard_slot()
+            return
+
+        with self._cond:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((conn, created_at))
+                self._cond.notify()
+                return
+        # overflow connection: don't keep it around
+        self._close_quietly(conn)
+        self._discard_slot()
+
+    def _validate(self, entry):
+        conn, created_at = entry
+        if self.pool_recycle and time.monotonic() - created_at > self.pool_recycle:
+            self._close_quietly(conn)
+            with self._cond:
+                self._stats["recycled"] += 1
+            return None
+        if self.pre_ping:
+            try:
+                conn.ping(reconnect=False)
+            except mysql.connector.Error:
+                self._close_quietly(conn)
+                with self._cond:
+                    self._stats["invalidated"] += 1
+                return None
+        return entry
+
+    def _new_connection(self):
+        conn = self.connect(**self.connect_args)
+        with self._cond:
+            self._stats["connects"] += 1
+        return conn, time.monotonic()
+
+    def _discard_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ---------------------------
+    # housekeeping
+    # ---------------------------
+    def dispose(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data.update({
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "checked_out": self._open - len(self._idle),
+                "pid": self.pid,
+            })
+        return data
+
+
+class PooledConnection:
+    """Proxy handed out by get_db(). Behaves like a mysql.connector
+    connection, but close() gives it back to the pool instead of tearing
+    down the socket. When bound to a request, close() is a no-op and the
+    connection goes back in the request teardown."""
+
+    def __init__(self, pool, conn, created_at, request_bound=False, cursor_wrapper=None):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+        self._request_bound = request_bound
+        self._cursor_wrapper = cursor_wrapper  # e.g. SQL timing, see sql_metrics
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        if self._cursor_wrapper is not None:
+            cursor = self._cursor_wrapper(cursor)
+        return cursor
+
+    def close(self):
+        if self._request_bound:
+            return
+        self.release()
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._conn, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,35 @@
+# fast_json.py
+# JSON encoding for the /api/v1 responses. Uses orjson when it is installed
+# (several times faster than the stdlib on long row lists, and it encodes
+# datetimes natively); otherwise falls back to json with compact separators.
+# Either way MySQL values (Decimal, date/datetime, TIME as timedelta, bytes)
+# come out the same.
+import datetime
+import decimal
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):  # mysql.connector returns TIME columns as timedelta
+        return str(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8", "replace")
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serialize to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
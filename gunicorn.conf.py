@@ -0,0 +1,25 @@
+# gunicorn.conf.py
+#   PROMETHEUS_MULTIPROC_DIR=/run/portal-metrics gunicorn -c gunicorn.conf.py app:app
+#
+# With PROMETHEUS_MULTIPROC_DIR set, every worker writes its metrics to files
+# in that directory and /metrics merges them (see metrics.py). The directory
+# must be emptied before each start, and dead workers' live gauges dropped.
+import glob
+import os
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+bind = os.environ.get("BIND", "127.0.0.1:8000")
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for name in glob.glob(os.path.join(path, "*.db")):
+            os.remove(name)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,196 @@
+# jobs.py
+# Persistent background job queue (MySQL table `import_jobs`) used for
+# Google Scholar imports, plus the worker loop that drains it.
+#
+# Jobs are claimed with a single UPDATE ... LIMIT 1 tagged with the worker's
+# id, so two workers never run the same job. A running job whose heartbeat
+# (locked_at) is older than `stale_after` seconds belongs to a crashed worker
+# and is claimed again; the import handler is idempotent (existing titles
+# are skipped), so a retried job never duplicates rows.
+import os
+import socket
+import time
+import uuid
+
+import mysql.connector
+
+JOB_MAX_ATTEMPTS = 3
+
+
+def ensure_jobs_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            scholar_link TEXT NOT NULL,
+            status ENUM('queued','running','done','failed') NOT NULL DEFAULT 'queued',
+            fetched INT NOT NULL DEFAULT 0,
+            saved INT NOT NULL DEFAULT 0,
+            skipped INT NOT NULL DEFAULT 0,
+            attempts INT NOT NULL DEFAULT 0,
+            error TEXT,
+            locked_by VARCHAR(128) NULL,
+            locked_at DATETIME NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_jobs_status (status, locked_at),
+            KEY idx_jobs_user (user_id, id),
+            FOREIGN KEY (user_id) REFERENCES users_new(id)
+                ON UPDATE CASCADE ON DELETE CASCADE
+        )
+    """)
+
+
+def enqueue(conn, user_id, scholar_link):
+    """Queue an import for `user_id` and return its job id. If the user
+    already has a queued/running import, that job's id is returned instead."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id FROM import_jobs
+        WHERE user_id=%s AND status IN ('queued','running')
+        ORDER BY id DESC LIMIT 1
+    """, (user_id,))
+    row = cursor.fetchone()
+    if row:
+        cursor.close()
+        return row[0]
+    cursor.execute("INSERT INTO import_jobs (user_id, scholar_link) VALUES (%s, %s)",
+                   (user_id, scholar_link))
+    job_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    return job_id
+
+
+def claim(conn, worker_id, stale_after=300):
+    """Atomically take the oldest queued job (or a running job whose worker
+    stopped heartbeating). Returns the job as a dict, or None."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        UPDATE import_jobs
+        SET status='running', locked_by=%s, locked_at=NOW(), attempts=attempts+1
+        WHERE status='queued'
+           OR (status='running' AND locked_at < NOW() - INTERVAL %s SECOND)
+        ORDER BY id
+        LIMIT 1
+    """, (worker_id, stale_after))
+    conn.commit()
+    if cursor.rowcount == 0:
+        cursor.close()
+        return None
+    cursor.execute("""
+        SELECT * FROM import_jobs
+        WHERE locked_by=%s AND status='running'
+        ORDER BY locked_at DESC, id DESC LIMIT 1
+    """, (worker_id,))
+    job = cursor.fetchone()
+    cursor.close()
+    return job
+
+
+def update_progress(conn, job_id, worker_id, **counts):
+    """Record fetched/saved/skipped counts and refresh the heartbeat. Returns
+    False if the job was reclaimed by another worker in the meantime."""
+    cols = [c for c in ("fetched", "saved", "skipped") if c in counts]
+    sets = ", ".join([f"{c}=%s" for c in cols] + ["locked_at=NOW()"])
+    cursor = conn.cursor()
+    cursor.execute(f"UPDATE import_jobs SET {sets} WHERE id=%s AND locked_by=%s",
+                   tuple(counts[c] for c in cols) + (job_id, worker_id))
+    owned = cursor.rowcount > 0
+    conn.commit()
+    cursor.close()
+    return owned
+
+
+def finish(conn, job_id, worker_id, status, error=None):
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE import_jobs SET status=%s, error=%s, locked_by=NULL, locked_at=NULL
+        WHERE id=%s AND locked_by=%s
+    """, (status, error, job_id, worker_id))
+    conn.commit()
+    cursor.close()
+
+
+def release_for_retry(conn, job, worker_id, error):
+    """Put a failed job back in the queue, or fail it for good once it has
+    used up JOB_MAX_ATTEMPTS."""
+    if job["attempts"] >= JOB_MAX_ATTEMPTS:
+        finish(conn, job["id"], worker_id, "failed", error)
+        return
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE import_jobs SET status='queued', error=%s, locked_by=NULL, locked_at=NULL
+        WHERE id=%s AND locked_by=%s
+    """, (error, job["id"], worker_id))
+    conn.commit()
+    cursor.close()
+
+
+def get_job(conn, job_id, user_id=None):
+    cursor = conn.cursor(dictionary=True)
+    sql = """
+        SELECT id, user_id, status, fetched, saved, skipped, attempts, error,
+               created_at, updated_at
+        FROM import_jobs WHERE id=%s
+    """
+    params = [job_id]
+    if user_id is not None:
+        sql += " AND user_id=%s"
+        params.append(user_id)
+    cursor.execute(sql, tuple(params))
+    job = cursor.fetchone()
+    cursor.close()
+    return job
+
+
+def latest_job_for_user(conn, user_id):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, status, fetched, saved, skipped, error
+        FROM import_jobs WHERE user_id=%s
+        ORDER BY id DESC LIMIT 1
+    """, (user_id,))
+    job = cursor.fetchone()
+    cursor.close()
+    return job
+
+
+def make_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def run_worker(get_db, handler, logger, poll_interval=2.0, stale_after=300,
+               worker_id=None, stop=None):
+    """Claim and run jobs until `stop` (a threading/multiprocessing Event) is
+    set. `handler(job, progress)` does the work and calls
+    progress(fetched=..., saved=..., skipped=...) as it goes."""
+    worker_id = worker_id or make_worker_id()
+    logger.info("Import worker %s started", worker_id)
+
+    while stop is None or not stop.is_set():
+        conn = get_db()
+        job = None
+        try:
+            job = claim(conn, worker_id, stale_after)
+            if job is not None:
+                logger.info("Worker %s running import job %s (attempt %s)",
+                            worker_id, job["id"], job["attempts"])
+
+                def progress(**counts):
+                    return update_progress(conn, job["id"], worker_id, **counts)
+
+                try:
+                    handler(job, progress)
+                    finish(conn, job["id"], worker_id, "done")
+                except Exception as e:
+                    logger.error("Import job %s failed: %s", job["id"], e)
+                    conn.rollback()
+                    release_for_retry(conn, job, worker_id, str(e))
+        except mysql.connector.Error as e:
+            logger.error("Import worker %s database error: %s", worker_id, e)
+        finally:
+            conn.close()
+
+        if job is None:
+            time.sleep(poll_interval)
@@ -0,0 +1,60 @@
+# metrics.py
+# Prometheus metrics for /metrics.
+#
+# Under gunicorn every worker is its own process, so metrics use
+# prometheus_client's multiprocess mode: set PROMETHEUS_MULTIPROC_DIR to an
+# empty directory before starting gunicorn (see gunicorn.conf.py) and each
+# worker writes its samples to mmap'ed files there; the scrape merges them.
+# Without the variable (dev server) the default in-process registry is used.
+# Recording a sample is a dict lookup plus an mmap write, cheap enough for
+# every request.
+import os
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter,
+                               Gauge, Histogram, generate_latest, multiprocess)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 5e7, 1e8, 5e8, 1e9)
+
+REQUEST_LATENCY = Histogram(
+    "portal_request_duration_seconds", "HTTP request latency by Flask endpoint.",
+    ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS)
+REQUEST_DB_TIME = Histogram(
+    "portal_request_db_seconds", "Time spent in SQL per request.",
+    ["endpoint"], buckets=LATENCY_BUCKETS)
+REQUEST_QUERIES = Counter(
+    "portal_db_queries_total", "SQL statements executed.", ["endpoint"])
+
+SCHOLAR_FETCHES = Counter(
+    "portal_scholar_fetches_total", "Author fetches from Google Scholar by outcome.",
+    ["outcome"])  # complete | partial | error | invalid_link
+SCHOLAR_PUBLICATIONS = Counter(
+    "portal_scholar_publications_total", "Publications filled from Google Scholar by result.",
+    ["result"])   # filled | failed
+
+EXPORT_BYTES = Histogram(
+    "portal_report_export_bytes", "Size of report downloads.",
+    ["report", "format", "source"], buckets=SIZE_BUCKETS)  # source: snapshot | built
+
+# pool numbers are per worker; livesum adds up the workers that are alive
+POOL_GAUGES = {
+    name: Gauge(f"portal_db_pool_{name}", f"Connection pool: {name.replace('_', ' ')}.",
+                multiprocess_mode="livesum")
+    for name in ("open", "idle", "checked_out", "checkouts", "waits", "timeouts",
+                 "connects", "recycled", "invalidated")
+}
+
+
+def update_pool_gauges(stats):
+    for name, gauge in POOL_GAUGES.items():
+        gauge.set(stats.get(name, 0))
+
+
+def render():
+    """Return (body, content_type) for the /metrics endpoint."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
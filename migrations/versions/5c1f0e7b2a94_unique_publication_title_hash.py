@@ -0,0 +1,48 @@
+"""Make (user_id, title_hash) on publications unique
+
+Revision ID: 5c1f0e7b2a94
+Revises: ae3e2da9c33d
+Create Date: 2026-10-18 18:00:00.000000
+
+The Scholar import dedupe was check-then-insert, so two imports of the same
+user could both insert a title. Existing duplicates are deleted (the oldest
+row is kept); run `flask --app app repair-stats` afterwards if any were.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1f0e7b2a94'
+down_revision = 'ae3e2da9c33d'
+branch_labels = None
+depends_on = None
+
+
+def _index_names(table):
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    names = _index_names('publications')
+    if 'uq_publications_user_title_hash' in names:
+        return
+
+    op.execute("""
+        DELETE p FROM publications p
+        JOIN publications keep ON keep.user_id = p.user_id
+                               AND keep.title_hash = p.title_hash
+                               AND keep.id < p.id
+    """)
+    op.create_index('uq_publications_user_title_hash', 'publications',
+                    ['user_id', 'title_hash'], unique=True)
+    if 'idx_publications_user_title_hash' in names:
+        op.drop_index('idx_publications_user_title_hash', table_name='publications')
+
+
+def downgrade():
+    names = _index_names('publications')
+    if 'idx_publications_user_title_hash' not in names:
+        op.create_index('idx_publications_user_title_hash', 'publications', ['user_id', 'title_hash'])
+    if 'uq_publications_user_title_hash' in names:
+        op.drop_index('uq_publications_user_title_hash', table_name='publications')
@@ -0,0 +1,95 @@
+"""Indexes for hot lookups, numeric pub_year and title_hash on publications
+
+Revision ID: ae3e2da9c33d
+Revises: 134e11e4c92a
+Create Date: 2026-10-18 12:00:00.000000
+
+Hot queries in app.py and the index each one uses:
+
+  publications WHERE user_id=? ORDER BY pub_year DESC  -> idx_publications_user_year
+  publications WHERE user_id=? (title_hash dedupe)     -> idx_publications_user_title_hash
+                                                          (now UNIQUE uq_publications_user_title_hash,
+                                                          see 5c1f0e7b2a94)
+  users_new WHERE email=? (login)                      -> idx_users_email / UNIQUE(email)
+  patents / commercializations WHERE user_id=?
+      ORDER BY id DESC                                 -> the user_id FK index; InnoDB
+                                                          secondary indexes carry the
+                                                          primary key, so it is already
+                                                          (user_id, id) and needs no
+                                                          extra composite index
+
+Every step checks the live schema first, so this is safe on databases that
+ensure_base_tables() already created with these columns and indexes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ae3e2da9c33d'
+down_revision = '134e11e4c92a'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table):
+    inspector = sa.inspect(op.get_bind())
+    return [(ix['name'], ix['column_names']) for ix in inspector.get_indexes(table)]
+
+
+def _has_index_on(table, columns):
+    """True if some index (unique or not) starts with `columns`."""
+    return any(cols[:len(columns)] == columns for _, cols in _indexes(table))
+
+
+def upgrade():
+    existing = _columns('publications')
+    with op.batch_alter_table('publications', schema=None) as batch_op:
+        if 'pub_year' not in existing:
+            batch_op.add_column(sa.Column('pub_year', sa.SmallInteger(), nullable=True))
+        if 'title_hash' not in existing:
+            batch_op.add_column(sa.Column('title_hash', sa.CHAR(length=40), nullable=True))
+
+    # backfill; must match pub_year_value() / title_hash() in app.py
+    op.execute("""
+        UPDATE publications
+        SET pub_year = CAST(LEFT(TRIM(year), 4) AS UNSIGNED)
+        WHERE pub_year IS NULL AND TRIM(year) REGEXP '^[0-9]{4}'
+    """)
+    op.execute("""
+        UPDATE publications
+        SET title_hash = SHA1(LOWER(TRIM(REGEXP_REPLACE(title, '[[:space:]]+', ' '))))
+        WHERE title_hash IS NULL
+    """)
+
+    names = {name for name, _ in _indexes('publications')}
+    if 'idx_publications_user_year' not in names:
+        op.create_index('idx_publications_user_year', 'publications', ['user_id', 'pub_year'])
+    if 'idx_publications_user_title_hash' not in names:
+        op.create_index('idx_publications_user_title_hash', 'publications', ['user_id', 'title_hash'])
+
+    if not _has_index_on('users_new', ['email']):
+        op.create_index('idx_users_email', 'users_new', ['email'])
+
+
+def downgrade():
+    names = {name for name, _ in _indexes('users_new')}
+    if 'idx_users_email' in names:
+        op.drop_index('idx_users_email', table_name='users_new')
+
+    names = {name for name, _ in _indexes('publications')}
+    if 'idx_publications_user_title_hash' in names:
+        op.drop_index('idx_publications_user_title_hash', table_name='publications')
+    if 'idx_publications_user_year' in names:
+        op.drop_index('idx_publications_user_year', table_name='publications')
+
+    existing = _columns('publications')
+    with op.batch_alter_table('publications', schema=None) as batch_op:
+        if 'title_hash' in existing:
+            batch_op.drop_column('title_hash')
+        if 'pub_year' in existing:
+            batch_op.drop_column('pub_year')
@@ -0,0 +1,411 @@
+# online_ddl.py
+# Background ADD/DROP COLUMN for the dynamic-field tables, tracked in the
+# `schema_changes` table so the admin UI can show progress.
+#
+# Each change tries, in order:
+#   1. ALGORITHM=INSTANT             metadata only (MySQL 8.0+, MariaDB 10.3+)
+#   2. ALGORITHM=INPLACE, LOCK=NONE  rebuilds in place, reads/writes continue
+#   3. shadow copy                   copy of the table with the new definition,
+#                                    filled in id-range chunks while triggers
+#                                    mirror concurrent writes, then swapped in
+#                                    with one atomic RENAME TABLE
+# Every step that needs the table's metadata lock waits at most
+# LOCK_WAIT_TIMEOUT seconds and retries, so the ALTER never queues the app's
+# own queries behind it for long.
+#
+# One runner at a time, across processes: run_pending() holds the MySQL
+# named lock RUNNER_LOCK for as long as it works. The lock dies with its
+# connection, so a change left 'running' while the lock is free was
+# interrupted; the next runner cleans up its shadow table/triggers and
+# starts it over. The caller's on_complete(cursor, change) updates the
+# field metadata in the same transaction that marks the change done.
+#
+# A change may also name a physical column other than the field
+# (column_name), make it a VIRTUAL generated column (generated_as), index it
+# (add_index), and -- for fields kept in a JSON document column
+# (json_column) -- strip the dropped field's key from every row afterwards,
+# in id chunks like the shadow copy.
+import re
+import time
+
+import mysql.connector
+
+RUNNER_LOCK = "innovation_portal.schema_changes"
+LOCK_WAIT_TIMEOUT = 5     # seconds an ALTER/RENAME may wait for the metadata lock
+LOCK_RETRIES = 20
+COPY_CHUNK_SIZE = 5000    # rows per INSERT ... SELECT in the shadow copy
+
+# errors meaning "this ALGORITHM/LOCK combination isn't available here"
+UNSUPPORTED_ERRNOS = {
+    1064,  # older servers don't know ALGORITHM=INSTANT at all
+    1845,  # ER_ALTER_OPERATION_NOT_SUPPORTED
+    1846,  # ER_ALTER_OPERATION_NOT_SUPPORTED_REASON
+}
+LOCK_WAIT_ERRNO = 1205
+
+
+def ensure_schema_changes_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_changes (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            table_name VARCHAR(128) NOT NULL,
+            field_name VARCHAR(128) NOT NULL,
+            action ENUM('add','drop') NOT NULL,
+            column_type VARCHAR(64) NULL,
+            field_label VARCHAR(255) NULL,
+            field_type VARCHAR(64) NULL,
+            is_required TINYINT(1) NOT NULL DEFAULT 0,
+            options TEXT,
+            column_name VARCHAR(128) NULL,
+            generated_as TEXT NULL,
+            add_index TINYINT(1) NOT NULL DEFAULT 0,
+            json_column VARCHAR(64) NULL,
+            status ENUM('queued','running','done','failed') NOT NULL DEFAULT 'queued',
+            method VARCHAR(16) NULL,
+            rows_total BIGINT NULL,
+            rows_copied BIGINT NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_schema_changes_status (status, id)
+        )
+    """)
+
+
+# ---------------------------
+# queue
+# ---------------------------
+def enqueue(conn, table_name, field_name, action, column_type=None, field_label=None,
+            field_type=None, is_required=False, options=None, column_name=None,
+            generated_as=None, add_index=False, json_column=None):
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO schema_changes (table_name, field_name, action, column_type,
+                                    field_label, field_type, is_required, options,
+                                    column_name, generated_as, add_index, json_column)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (table_name, field_name, action, column_type, field_label, field_type,
+          1 if is_required else 0, options, column_name, generated_as,
+          1 if add_index else 0, json_column))
+    change_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    return change_id
+
+
+def pending_change(conn, table_name, field_name):
+    """The queued/running change for this column, if any."""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, action, status FROM schema_changes
+        WHERE table_name=%s AND field_name=%s AND status IN ('queued','running')
+        ORDER BY id LIMIT 1
+    """, (table_name, field_name))
+    row = cursor.fetchone()
+    cursor.close()
+    return row
+
+
+def recent_changes(conn, limit=10):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, table_name, field_name, action, status, method, rows_total, rows_copied,
+               error, created_at, updated_at
+        FROM schema_changes ORDER BY id DESC LIMIT %s
+    """, (limit,))
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def needs_runner(conn):
+    """True if work is waiting and no runner holds the lock."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT EXISTS(SELECT 1 FROM schema_changes WHERE status IN ('queued','running')),
+               IS_FREE_LOCK(%s)
+    """, (RUNNER_LOCK,))
+    waiting, free = cursor.fetchone()
+    cursor.close()
+    return bool(waiting) and bool(free)
+
+
+def _set(conn, change_id, **fields):
+    cursor = conn.cursor()
+    cursor.execute(f"UPDATE schema_changes SET {', '.join(f'{k}=%s' for k in fields)} WHERE id=%s",
+                   (*fields.values(), change_id))
+    conn.commit()
+    cursor.close()
+
+
+# ---------------------------
+# runner
+# ---------------------------
+def run_pending(get_db, logger, on_complete):
+    """Run queued schema changes until none are left. Returns immediately if
+    another runner (any process) is already at it."""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT GET_LOCK(%s, 0)", (RUNNER_LOCK,))
+    if cursor.fetchone()[0] != 1:
+        cursor.close()
+        conn.close()
+        return
+    try:
+        cursor.execute(f"SET SESSION lock_wait_timeout = {LOCK_WAIT_TIMEOUT}")
+        # we hold the lock, so anything still 'running' was interrupted
+        cursor.execute("UPDATE schema_changes SET status='queued' WHERE status='running'")
+        conn.commit()
+
+        while True:
+            cursor.execute("SELECT id FROM schema_changes WHERE status='queued' ORDER BY id LIMIT 1")
+            row = cursor.fetchone()
+            if row is None:
+                break
+            _run_one(conn, row[0], logger, on_complete)
+    finally:
+        try:
+            conn.rollback()
+            cursor.execute("SET SESSION lock_wait_timeout = DEFAULT")
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (RUNNER_LOCK,))
+            cursor.fetchone()
+        except mysql.connector.Error:
+            pass
+        cursor.close()
+        conn.close()
+
+
+def wait_until_idle(get_db, logger, on_complete, poll_interval=2.0):
+    """Foreground mode: run queued changes here, or wait for the runner that
+    holds the lock, until nothing is queued or running. Returns the changes
+    that failed in the meantime."""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT NOW()")
+    started = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+
+    while True:
+        run_pending(get_db, logger, on_complete)  # no-op while another runner is at it
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT COUNT(*) AS n FROM schema_changes WHERE status IN ('queued','running')")
+        active = cursor.fetchone()["n"]
+        failed = []
+        if not active:
+            cursor.execute("""
+                SELECT id, table_name, field_name, action, error FROM schema_changes
+                WHERE status='failed' AND updated_at >= %s ORDER BY id
+            """, (started,))
+            failed = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        if not active:
+            return failed
+        time.sleep(poll_interval)
+
+
+def _run_one(conn, change_id, logger, on_complete):
+    _set(conn, change_id, status="running", method=None, rows_copied=0, rows_total=None, error=None)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT * FROM schema_changes WHERE id=%s", (change_id,))
+    change = cursor.fetchone()
+    cursor.close()
+
+    table, field = change["table_name"], change["field_name"]
+    column = change["column_name"] or field
+    # dropping a JSON-stored field without a generated column touches no DDL
+    alter = change["action"] == "add" or change["column_name"] or not change["json_column"]
+    if change["action"] == "add":
+        if change["generated_as"]:
+            clause = (f"ADD COLUMN `{column}` {change['column_type']} "
+                      f"GENERATED ALWAYS AS ({change['generated_as']}) VIRTUAL")
+        else:
+            clause = f"ADD COLUMN `{column}` {change['column_type']} DEFAULT NULL"
+        if change["add_index"]:
+            clause += f", ADD INDEX `idx_{table}_{column}` (`{column}`)"
+    else:
+        clause = f"DROP COLUMN `{column}`"
+
+    try:
+        _cleanup_shadow(conn, table, change_id)  # leftovers of an interrupted attempt
+        method = None
+        if alter and _column_done(conn, change):
+            method = "none"  # e.g. the previous attempt got as far as the swap
+        elif alter:
+            method = _alter_online(conn, table, clause, change_id, logger)
+            if method is None:
+                _set(conn, change_id, method="copy")
+                _shadow_copy(conn, change, clause)
+                method = "copy"
+        if change["action"] == "drop" and change["json_column"]:
+            _purge_json_key(conn, change)
+            method = method or "purge"
+
+        cursor = conn.cursor()
+        on_complete(cursor, change)
+        cursor.execute("UPDATE schema_changes SET status='done', method=%s WHERE id=%s",
+                       (method, change_id))
+        conn.commit()
+        cursor.close()
+        logger.info("Schema change %s (%s %s.%s) done via %s", change_id, change["action"],
+                    table, field, method)
+    except Exception as e:
+        conn.rollback()
+        logger.error("Schema change %s (%s %s.%s) failed: %s", change_id, change["action"],
+                     table, field, e)
+        _cleanup_shadow(conn, table, change_id)
+        _set(conn, change_id, status="failed", error=str(e))
+
+
+def _column_done(conn, change):
+    cursor = conn.cursor()
+    cursor.execute(f"SHOW COLUMNS FROM `{change['table_name']}` LIKE %s",
+                   (change["column_name"] or change["field_name"],))
+    exists = cursor.fetchone() is not None
+    cursor.close()
+    return exists if change["action"] == "add" else not exists
+
+
+def _with_lock_retries(fn):
+    """Run fn(); on a metadata-lock timeout back off and try again."""
+    for attempt in range(LOCK_RETRIES):
+        try:
+            return fn()
+        except mysql.connector.Error as e:
+            if e.errno != LOCK_WAIT_ERRNO or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(min(0.5 * 2 ** attempt, 10))
+
+
+def _alter_online(conn, table, clause, change_id, logger):
+    """Try INSTANT, then INPLACE/LOCK=NONE. Returns the method used, or None
+    if neither is supported for this change."""
+    for method, options in (("instant", "ALGORITHM=INSTANT"),
+                            ("inplace", "ALGORITHM=INPLACE, LOCK=NONE")):
+        _set(conn, change_id, method=method)
+        cursor = conn.cursor()
+        try:
+            _with_lock_retries(lambda: cursor.execute(f"ALTER TABLE `{table}` {clause}, {options}"))
+            return method
+        except mysql.connector.Error as e:
+            if e.errno not in UNSUPPORTED_ERRNOS:
+                raise
+            logger.info("%s not available for ALTER TABLE %s %s: %s", options, table, clause, e.msg)
+        finally:
+            cursor.close()
+    return None
+
+
+# ---------------------------
+# shadow copy
+# ---------------------------
+def _shadow_names(table, change_id):
+    return (f"_{table}_new_{change_id}", f"_{table}_old_{change_id}",
+            [f"_{table}_{change_id}_{op}" for op in ("ins", "upd", "del")])
+
+
+def _cleanup_shadow(conn, table, change_id):
+    new, old, triggers = _shadow_names(table, change_id)
+    cursor = conn.cursor()
+    for trigger in triggers:
+        cursor.execute(f"DROP TRIGGER IF EXISTS `{trigger}`")
+    cursor.execute(f"DROP TABLE IF EXISTS `{new}`")
+    cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+    cursor.close()
+
+
+def _columns(cursor, table):
+    """Stored columns; generated ones can't be written and are recomputed anyway."""
+    cursor.execute(f"SHOW COLUMNS FROM `{table}`")
+    return [row[0] for row in cursor.fetchall() if "GENERATED" not in (row[5] or "").upper()]
+
+
+def _shadow_copy(conn, change, clause):
+    table, change_id = change["table_name"], change["id"]
+    new, old, (trg_ins, trg_upd, trg_del) = _shadow_names(table, change_id)
+    cursor = conn.cursor()
+
+    # empty copy with the new definition. CREATE TABLE ... LIKE drops foreign
+    # keys, so start from SHOW CREATE TABLE; constraint names are unique per
+    # schema and get renamed.
+    cursor.execute(f"SHOW CREATE TABLE `{table}`")
+    create_sql = cursor.fetchone()[1]
+    create_sql = create_sql.replace(f"CREATE TABLE `{table}`", f"CREATE TABLE `{new}`", 1)
+    counter = iter(range(1, 1000))
+    create_sql = re.sub(r"CONSTRAINT `[^`]+`",
+                        lambda m: f"CONSTRAINT `{table}_fk_c{change_id}_{next(counter)}`", create_sql)
+    cursor.execute(create_sql)
+    cursor.execute(f"ALTER TABLE `{new}` {clause}")
+
+    new_cols = _columns(cursor, new)
+    common = [c for c in new_cols if c in set(_columns(cursor, table))]
+    col_list = ", ".join(f"`{c}`" for c in common)
+    new_values = ", ".join(f"NEW.`{c}`" for c in common)
+
+    # mirror writes made while we copy
+    _with_lock_retries(lambda: cursor.execute(
+        f"CREATE TRIGGER `{trg_ins}` AFTER INSERT ON `{table}` FOR EACH ROW "
+        f"REPLACE INTO `{new}` ({col_list}) VALUES ({new_values})"))
+    _with_lock_retries(lambda: cursor.execute(
+        f"CREATE TRIGGER `{trg_upd}` AFTER UPDATE ON `{table}` FOR EACH ROW "
+        f"REPLACE INTO `{new}` ({col_list}) VALUES ({new_values})"))
+    _with_lock_retries(lambda: cursor.execute(
+        f"CREATE TRIGGER `{trg_del}` AFTER DELETE ON `{table}` FOR EACH ROW "
+        f"DELETE IGNORE FROM `{new}` WHERE id = OLD.id"))
+
+    cursor.execute(f"SELECT MIN(id), MAX(id), COUNT(*) FROM `{table}`")
+    low, high, total = cursor.fetchone()
+    _set(conn, change_id, rows_total=total)
+
+    copied = 0
+    start = low
+    while start is not None and start <= high:
+        end = start + COPY_CHUNK_SIZE - 1
+        # IGNORE: a row a trigger already mirrored is newer than what we read
+        cursor.execute(f"INSERT IGNORE INTO `{new}` ({col_list}) "
+                       f"SELECT {col_list} FROM `{table}` WHERE id BETWEEN %s AND %s "
+                       f"LOCK IN SHARE MODE", (start, end))
+        copied += max(cursor.rowcount, 0)
+        conn.commit()
+        _set(conn, change_id, rows_copied=copied)
+        start = end + 1
+
+    # swap both names in one atomic statement; the triggers move with the old table
+    _with_lock_retries(lambda: cursor.execute(
+        f"RENAME TABLE `{table}` TO `{old}`, `{new}` TO `{table}`"))
+    for trigger in (trg_ins, trg_upd, trg_del):
+        cursor.execute(f"DROP TRIGGER IF EXISTS `{trigger}`")
+    cursor.execute(f"DROP TABLE `{old}`")
+    cursor.close()
+
+
+# ---------------------------
+# JSON key purge
+# ---------------------------
+def _purge_json_key(conn, change):
+    """Remove a dropped field's key from the JSON documents, chunk by chunk,
+    so a field added later under the same name starts out empty."""
+    table, doc = change["table_name"], change["json_column"]
+    path = f'$."{change["field_name"]}"'
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(id), MAX(id), COUNT(*) FROM `{table}` "
+                   f"WHERE JSON_CONTAINS_PATH(`{doc}`, 'one', %s)", (path,))
+    low, high, total = cursor.fetchone()
+    _set(conn, change["id"], rows_total=total)
+
+    purged = 0
+    start = low
+    while start is not None and start <= high:
+        end = start + COPY_CHUNK_SIZE - 1
+        # updated_at kept as is: the row's own data didn't change
+        _with_lock_retries(lambda: cursor.execute(
+            f"UPDATE `{table}` SET `{doc}` = JSON_REMOVE(`{doc}`, %s), updated_at = updated_at "
+            f"WHERE id BETWEEN %s AND %s AND JSON_CONTAINS_PATH(`{doc}`, 'one', %s)",
+            (path, start, end, path)))
+        purged += max(cursor.rowcount, 0)
+        conn.commit()
+        _set(conn, change["id"], rows_copied=purged)
+        start = end + 1
+    cursor.close()
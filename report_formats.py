@@ -0,0 +1,82 @@
+# report_formats.py
+# Typed Parquet / XLSX writers for the admin report downloads.
+#
+# Both writers take the report's columns and an iterator of row batches
+# (lists of tuples) and never hold more than one batch in memory: Parquet
+# gets one row group per batch, XLSX uses openpyxl's write-only mode.
+# pyarrow and openpyxl are optional; ExportUnavailable is raised when the
+# one needed for a format is not installed.
+import datetime
+
+
+class ExportUnavailable(RuntimeError):
+    pass
+
+
+def column_kind(sql_type):
+    """Map a column's SQL type (the values of VALID_TYPES in app.py) to the
+    kind of value the writers emit: int, float, date, bool or str."""
+    sql_type = (sql_type or "").upper()
+    if sql_type.startswith("TINYINT(1)"):
+        return "bool"
+    if sql_type.startswith(("INT", "BIGINT", "SMALLINT", "TINYINT")):
+        return "int"
+    if sql_type.startswith(("DOUBLE", "FLOAT", "DECIMAL")):
+        return "float"
+    if sql_type.startswith("DATE"):
+        return "date"
+    return "str"
+
+
+def _convert(value, kind):
+    if value is None:
+        return None
+    try:
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        if kind == "bool":
+            return bool(int(value))
+        if kind == "date":
+            if isinstance(value, datetime.datetime):
+                return value.date()
+            if isinstance(value, datetime.date):
+                return value
+            return datetime.date.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def write_parquet(fileobj, names, kinds, batches):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export needs the 'pyarrow' package.")
+
+    arrow_types = {"int": pa.int64(), "float": pa.float64(), "date": pa.date32(),
+                   "bool": pa.bool_(), "str": pa.string()}
+    schema = pa.schema([pa.field(name, arrow_types[kind]) for name, kind in zip(names, kinds)])
+
+    with pq.ParquetWriter(fileobj, schema, compression="snappy") as writer:
+        for rows in batches:
+            columns = [pa.array([_convert(row[i], kind) for row in rows], type=arrow_types[kind])
+                       for i, kind in enumerate(kinds)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def write_xlsx(fileobj, labels, kinds, batches, sheet_title="Report"):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportUnavailable("Excel export needs the 'openpyxl' package.")
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title[:31])
+    ws.append(labels)
+    for rows in batches:
+        for row in rows:
+            ws.append([_convert(value, kind) for value, kind in zip(row, kinds)])
+    wb.save(fileobj)
@@ -0,0 +1,193 @@
+# scholar_cache.py
+# Persistent cache for Google Scholar lookups.
+#
+# CachedScholarBackend wraps anything with scholarly's search_author_id/fill
+# and is what ScholarFetcher talks to. Entries live in a small SQLite file
+# with a TTL per entry and least-recently-used eviction once the file holds
+# more than max_bytes of payload. Values are pickled because scholarly's
+# dicts carry enum members (e.g. pub["source"]) that fill() dispatches on.
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+class ScholarCache:
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dirname, exist_ok=True)
+        db = self._db()
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        db.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        db.commit()
+
+    def _db(self):
+        # one sqlite connection per thread (fetch workers run concurrently)
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def get(self, key):
+        """Return the cached value or None on a miss / expired entry."""
+        db = self._db()
+        now = time.time()
+        row = db.execute("SELECT value, expires_at FROM entries WHERE key=?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        if row[1] < now:
+            db.execute("DELETE FROM entries WHERE key=?", (key,))
+            db.commit()
+            self._count("expired")
+            self._count("misses")
+            return None
+        db.execute("UPDATE entries SET accessed_at=? WHERE key=?", (now, key))
+        db.commit()
+        self._count("hits")
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        db = self._db()
+        db.execute("""
+            INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (key, blob, len(blob), now + ttl, now))
+        db.commit()
+        self._count("writes")
+        self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # expired entries go first, then least recently used
+        db.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+        evicted = 0
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM entries WHERE key=?", (key,))
+            total -= size
+            evicted += 1
+        db.commit()
+        self._count("evictions", evicted)
+
+    def clear(self):
+        db = self._db()
+        db.execute("DELETE FROM entries")
+        db.commit()
+
+    def stats(self):
+        db = self._db()
+        entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        with self._lock:
+            data = dict(self._stats)
+        lookups = data["hits"] + data["misses"]
+        data.update({
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(data["hits"] / lookups, 4) if lookups else None,
+        })
+        return data
+
+
+class MemoryScholarCache:
+    """In-process stand-in for ScholarCache (same interface, no eviction)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.time():
+                self._data.pop(key, None)
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._stats["writes"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["entries"] = len(self._data)
+        return data
+
+
+class CachedScholarBackend:
+    """scholarly-compatible backend that answers from the cache when it can.
+
+    Keys: author lookups on scholar id, an author's publication list on
+    scholar id, and filled publications on Scholar's author_pub_id. The
+    publication list gets a short TTL so citation counts stay fresh for the
+    incremental sync; filled publication details change rarely."""
+
+    def __init__(self, backend, cache, author_ttl=6 * 3600, pub_ttl=30 * 86400):
+        self.backend = backend
+        self.cache = cache
+        self.author_ttl = author_ttl
+        self.pub_ttl = pub_ttl
+
+    def _cached(self, key, ttl, fn, *args, **kwargs):
+        if key is None:
+            return fn(*args, **kwargs)
+        value = self.cache.get(key)
+        if value is None:
+            value = fn(*args, **kwargs)
+            self.cache.set(key, value, ttl)
+        return value
+
+    def search_author_id(self, scholar_id, *args, **kwargs):
+        return self._cached(f"author:{scholar_id}", self.author_ttl,
+                            self.backend.search_author_id, scholar_id, *args, **kwargs)
+
+    def fill(self, obj, sections=None, **kwargs):
+        if sections:
+            kwargs["sections"] = sections
+        key = None
+        ttl = self.pub_ttl
+        if "scholar_id" in obj and sections == ["publications"]:
+            key = f"author_pubs:{obj['scholar_id']}"
+            ttl = self.author_ttl
+        elif "author_pub_id" in obj and not sections:
+            key = f"pub:{obj['author_pub_id']}"
+        return self._cached(key, ttl, self.backend.fill, obj, **kwargs)
@@ -0,0 +1,185 @@
+# scholar_fetch.py
+# Concurrent Google Scholar fetch engine used by fetch_scholar_publications().
+#
+# scholarly.fill(pub) is one slow HTTP round trip per publication, so an
+# author's publications are filled by a bounded thread pool. All workers draw
+# from one token bucket so we stay under Scholar's throttling no matter how
+# many threads run, transient failures are retried with backoff, and a
+# per-author deadline returns whatever was filled so far.
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Take one token, sleeping as needed. Returns False if the token
+        would only become available after `deadline` (a monotonic time)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+
+
+class FetchResult:
+    def __init__(self, author=None, publications=None, failed=0, complete=True):
+        self.author = author
+        self.publications = publications or []  # filled pub dicts, in author order
+        self.failed = failed                     # pubs that exhausted their retries
+        self.complete = complete                 # False when the deadline cut us short
+
+
+class ScholarFetcher:
+    def __init__(self, backend, workers=8, rate=5.0, burst=5, retries=3,
+                 backoff=0.5, max_backoff=8.0, deadline=120.0, heartbeat=10.0, logger=None):
+        self.backend = backend  # anything with scholarly's search_author_id/fill
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.heartbeat = heartbeat  # max seconds between on_progress calls while filling
+        self.logger = logger
+
+    def _call(self, fn, *args, deadline, stop, **kwargs):
+        """Call a backend function under the rate limit, retrying with
+        exponential backoff and jitter. Raises the last error when retries
+        run out, or TimeoutError once the deadline has passed."""
+        attempt = 0
+        while True:
+            if stop.is_set() or not self.bucket.acquire(deadline):
+                raise TimeoutError("per-author deadline reached")
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+                delay *= random.uniform(0.5, 1.0)
+                if time.monotonic() + delay > deadline:
+                    raise
+                if self.logger:
+                    self.logger.info("Retrying Scholar call (%d/%d) after error: %s",
+                                     attempt, self.retries, e)
+                stop.wait(delay)
+
+    def fetch_author(self, scholar_id, pubs_filter=None, on_progress=None):
+        """Fetch an author and fill their publications concurrently.
+        `pubs_filter`, if given, picks which of the author's lightweight
+        publication entries actually need a fill(). `on_progress(filled)`,
+        if given, is called from this thread at least every `heartbeat`
+        seconds (e.g. to keep a job's heartbeat fresh)."""
+        deadline = time.monotonic() + self.deadline
+        stop = threading.Event()
+        beat = on_progress or (lambda filled: None)
+
+        author = self._call(self.backend.search_author_id, scholar_id,
+                            deadline=deadline, stop=stop)
+        beat(0)
+        author = self._call(self.backend.fill, author, sections=["publications"],
+                            deadline=deadline, stop=stop)
+        beat(0)
+
+        pubs = author.get("publications", [])
+        if pubs_filter is not None:
+            pubs = pubs_filter(pubs)
+
+        result = FetchResult(author=author)
+        if not pubs:
+            return result
+
+        filled = [None] * len(pubs)
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._call, self.backend.fill, pub,
+                                   deadline=deadline, stop=stop): i
+                       for i, pub in enumerate(pubs)}
+            not_done = set(futures)
+            while not_done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, not_done = wait(not_done, timeout=min(remaining, self.heartbeat))
+                beat(len(futures) - len(not_done))
+            done = set(futures) - not_done
+            if not_done:
+                # let queued/retrying workers bail out instead of running on
+                stop.set()
+                for f in not_done:
+                    f.cancel()
+                result.complete = False
+
+            for f in done:
+                try:
+                    filled[futures[f]] = f.result()
+                except TimeoutError:
+                    result.complete = False
+                except Exception as e:
+                    failed += 1
+                    if self.logger:
+                        self.logger.warning("Skipping one publication due to error: %s", e)
+
+        result.publications = [p for p in filled if p is not None]
+        result.failed = failed
+        return result
+
+
+class FakeScholarly:
+    """Offline stand-in for `scholarly.scholarly` with simulated latency and
+    failures, for exercising ScholarFetcher without hitting Google Scholar."""
+
+    def __init__(self, num_publications=50, latency=0.05, failure_rate=0.1, seed=None):
+        self.num_publications = num_publications
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _simulate(self):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("simulated Scholar failure")
+
+    def search_author_id(self, scholar_id):
+        self._simulate()
+        return {"scholar_id": scholar_id, "name": f"Author {scholar_id}", "filled": []}
+
+    def fill(self, obj, sections=None):
+        self._simulate()
+        if "scholar_id" in obj:
+            obj = dict(obj)
+            obj["publications"] = [
+                {"author_pub_id": f"{obj['scholar_id']}:{i}",
+                 "bib": {"title": f"Publication {i}", "pub_year": str(2000 + i % 25)},
+                 "num_citations": i}
+                for i in range(self.num_publications)
+            ]
+            return obj
+        pub = dict(obj)
+        pub["bib"] = dict(pub.get("bib", {}), author="A. Author and B. Author")
+        pub["filled"] = True
+        return pub
@@ -0,0 +1,173 @@
+# sql_metrics.py
+# Per-request SQL instrumentation.
+#
+# get_db() connections hand out InstrumentedCursor objects that time every
+# execute()/executemany() and report (statement, seconds) to a callback.
+# app.py keeps a RequestQueries per request (count, total time -> Server-Timing
+# header; slowest statements -> slow-request log) and feeds the
+# process-wide SQLStats, which keeps a bounded window of recent samples per
+# route and per normalized statement for p50/p95 reporting.
+import collections
+import re
+import threading
+import time
+
+_WS_RE = re.compile(r"\s+")
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_RE = re.compile(r"(VALUES\s*\([^)]*\))(\s*,\s*\([^)]*\))+", re.IGNORECASE)
+
+
+def normalize_sql(statement):
+    """Collapse a statement to its shape so variants group together:
+    placeholders/literals become ?, IN lists and multi-row VALUES collapse."""
+    if isinstance(statement, (bytes, bytearray)):
+        statement = statement.decode("utf-8", "replace")
+    s = _WS_RE.sub(" ", statement).strip()
+    s = s.replace("%s", "?")
+    s = _STRING_RE.sub("?", s)
+    s = _NUMBER_RE.sub("?", s)
+    s = _IN_LIST_RE.sub("(?...)", s)
+    s = _VALUES_RE.sub(r"\1, ...", s)
+    return s[:500]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+class InstrumentedCursor:
+    """Wraps a mysql.connector cursor; everything not overridden is delegated."""
+
+    def __init__(self, cursor, on_query):
+        self._cursor = cursor
+        self._on_query = on_query
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._on_query(operation, time.perf_counter() - start)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._on_query(operation, time.perf_counter() - start)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class RequestQueries:
+    """What one request did: query count, DB time and its slowest statements."""
+
+    def __init__(self, keep=5):
+        self.count = 0
+        self.total = 0.0
+        self.keep = keep
+        self.slowest = []  # [(seconds, statement)], longest first
+
+    def add(self, statement, seconds):
+        self.count += 1
+        self.total += seconds
+        if len(self.slowest) < self.keep or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda x: x[0], reverse=True)
+            del self.slowest[self.keep:]
+
+
+class SQLStats:
+    """Process-wide aggregates with bounded memory: the last `samples`
+    measurements per route / statement, at most `max_routes` routes and at
+    most `max_statements` distinct normalized statements (the rest are
+    pooled under "(other)")."""
+
+    def __init__(self, samples=1000, max_statements=500, max_routes=200):
+        self.samples = samples
+        self.max_statements = max_statements
+        self.max_routes = max_routes
+        self._lock = threading.Lock()
+        self._routes = {}      # route -> {"requests", "queries", "db_ms": deque, "query_counts": deque}
+        self._statements = {}  # normalized -> {"calls", "total_ms", "ms": deque}
+
+    def record_statement(self, statement, seconds):
+        key = normalize_sql(statement)
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    key = "(other)"
+                    entry = self._statements.get(key)
+                if entry is None:
+                    entry = self._statements[key] = {
+                        "calls": 0, "total_ms": 0.0, "ms": collections.deque(maxlen=self.samples)}
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            entry["ms"].append(ms)
+
+    def record_request(self, route, queries):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                if len(self._routes) >= self.max_routes:
+                    route = "(other)"
+                    entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    "requests": 0, "queries": 0,
+                    "db_ms": collections.deque(maxlen=self.samples),
+                    "query_counts": collections.deque(maxlen=self.samples)}
+            entry["requests"] += 1
+            entry["queries"] += queries.count
+            entry["db_ms"].append(queries.total * 1000)
+            entry["query_counts"].append(queries.count)
+
+    def snapshot(self, top=50):
+        with self._lock:
+            routes = {k: (v["requests"], v["queries"], sorted(v["db_ms"]), sorted(v["query_counts"]))
+                      for k, v in self._routes.items()}
+            statements = [(k, v["calls"], v["total_ms"], sorted(v["ms"]))
+                          for k, v in self._statements.items()]
+
+        def r(x):
+            return None if x is None else round(x, 3)
+
+        route_rows = {
+            route: {
+                "requests": requests,
+                "queries": queries,
+                "queries_p50": percentile(counts, 50),
+                "queries_p95": percentile(counts, 95),
+                "db_ms_p50": r(percentile(db_ms, 50)),
+                "db_ms_p95": r(percentile(db_ms, 95)),
+            }
+            for route, (requests, queries, db_ms, counts) in routes.items()
+        }
+        statements.sort(key=lambda x: x[2], reverse=True)  # by total time
+        statement_rows = [
+            {
+                "statement": stmt,
+                "calls": calls,
+                "total_ms": r(total_ms),
+                "p50_ms": r(percentile(ms, 50)),
+                "p95_ms": r(percentile(ms, 95)),
+            }
+            for stmt, calls, total_ms, ms in statements[:top]
+        ]
+        return {"routes": route_rows, "statements": statement_rows}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._statements.clear()
@@ -0,0 +1,100 @@
+# tests/conftest.py
+# Tests marked `db` run against a scratch MySQL database (TEST_MYSQL_DATABASE,
+# default innovation_portal_test) on the server configured in config.py. It
+# is dropped and recreated once per session; without a reachable server
+# those tests are skipped. Tests of app.py's pure helpers use `app_module`
+# (importing app touches no database).
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402  (must be patched before app is imported)
+
+TEST_DATABASE = os.environ.get("TEST_MYSQL_DATABASE", "innovation_portal_test")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "db: needs a MySQL server (uses a scratch database)")
+
+
+@pytest.fixture(scope="session")
+def portal():
+    """The app module, bound to a freshly created scratch database."""
+    mysql_connector = pytest.importorskip("mysql.connector")
+    if TEST_DATABASE == config.MYSQL_CONFIG["database"]:
+        pytest.exit(f"TEST_MYSQL_DATABASE must not be the configured database '{TEST_DATABASE}'")
+
+    server_config = {k: v for k, v in config.MYSQL_CONFIG.items() if k != "database"}
+    try:
+        server = mysql_connector.connect(**server_config)
+    except mysql_connector.Error as e:
+        pytest.skip(f"MySQL not reachable: {e}")
+    cursor = server.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{TEST_DATABASE}`")
+    cursor.execute(f"CREATE DATABASE `{TEST_DATABASE}` CHARACTER SET utf8mb4")
+
+    config.MYSQL_CONFIG["database"] = TEST_DATABASE
+    import app as portal_module
+    portal_module.ensure_base_tables()
+    yield portal_module
+
+    cursor.execute(f"DROP DATABASE IF EXISTS `{TEST_DATABASE}`")
+    cursor.close()
+    server.close()
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    """The app module, for helpers that don't need a database."""
+    return pytest.importorskip("app")
+
+
+@pytest.fixture
+def admin_client(portal):
+    client = portal.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 0
+        sess["role"] = "admin"
+    return client
+
+
+def add_users(portal, count, publications=3, patents=1, commercializations=1):
+    """Insert `count` users with some children each, then rebuild the counters
+    (rows go in behind the app's back). Returns the new user ids."""
+    conn = portal.get_db()
+    cursor = conn.cursor()
+    cursor.execute("INSERT IGNORE INTO departments (name) VALUES ('Test Department')")
+    cursor.execute("SELECT id FROM departments WHERE name='Test Department'")
+    department_id = cursor.fetchone()[0]
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM users_new")
+    first = cursor.fetchone()[0] + 1
+
+    user_ids = []
+    for n in range(first, first + count):
+        cursor.execute("""INSERT INTO users_new (name, email, password, role, department_id)
+                          VALUES (%s, %s, 'x', 'user', %s)""",
+                       (f"Test User {n}", f"user{n}@test.example", department_id))
+        user_id = cursor.lastrowid
+        user_ids.append(user_id)
+        for i in range(publications):
+            title = f"Publication {i} of user {n}"
+            year = str(2000 + i)
+            cursor.execute("""INSERT INTO publications
+                                  (user_id, title, authors, year, pub_year, title_hash, citations)
+                              VALUES (%s, %s, 'A. Author', %s, %s, %s, '1')""",
+                           (user_id, title, year, portal.pub_year_value(year), portal.title_hash(title)))
+        for i in range(patents):
+            cursor.execute("INSERT INTO patents (user_id, title) VALUES (%s, %s)",
+                           (user_id, f"Patent {i} of user {n}"))
+        for i in range(commercializations):
+            cursor.execute("INSERT INTO commercializations (user_id, project_name) VALUES (%s, %s)",
+                           (user_id, f"Project {i} of user {n}"))
+    conn.commit()
+    cursor.close()
+    conn.close()
+    portal.rebuild_stats()
+    return user_ids
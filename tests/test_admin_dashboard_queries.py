@@ -0,0 +1,66 @@
+# Regression test: the admin dashboard and the per-user detail endpoints it
+# lazy-loads on expand run a fixed number of queries, however many users
+# (and child rows) there are.
+import pytest
+
+from conftest import add_users
+
+pytestmark = pytest.mark.db
+
+
+def dashboard_statements(portal, client, monkeypatch, url="/admin_dashboard"):
+    """GET `url` (the dashboard by default) and return the statements it ran,
+    as seen by the instrumented-cursor hook."""
+    statements = []
+    record_query = portal.record_query
+
+    def counting(statement, seconds):
+        statements.append(" ".join(str(statement).split()))
+        record_query(statement, seconds)
+
+    with monkeypatch.context() as m:
+        m.setattr(portal, "record_query", counting)
+        response = client.get(url)
+    assert response.status_code == 200
+    return statements
+
+
+def test_query_count_does_not_grow_with_users(portal, admin_client, monkeypatch):
+    add_users(portal, 3)
+    admin_client.get("/admin_dashboard")  # warm the dynamic field definition cache
+    few = dashboard_statements(portal, admin_client, monkeypatch)
+
+    add_users(portal, portal.ADMIN_PAGE_SIZE * 2, publications=5, patents=2, commercializations=2)
+    many = dashboard_statements(portal, admin_client, monkeypatch)
+
+    assert len(many) == len(few), "\n".join(["few users:"] + few + ["many users:"] + many)
+
+
+def test_next_page_query_count_is_constant(portal, admin_client, monkeypatch):
+    add_users(portal, portal.ADMIN_PAGE_SIZE * 2)
+    admin_client.get("/admin_dashboard")
+    conn = portal.get_db()
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(id) FROM users_new")
+    newest = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+
+    near_end = dashboard_statements(portal, admin_client, monkeypatch, f"/admin_dashboard?after={newest}")
+    add_users(portal, portal.ADMIN_PAGE_SIZE)
+    later = dashboard_statements(portal, admin_client, monkeypatch, f"/admin_dashboard?after={newest}")
+
+    assert len(later) == len(near_end)
+
+
+@pytest.mark.parametrize("detail", ["publications", "patents", "commercializations"])
+def test_user_detail_query_count_is_constant(portal, admin_client, monkeypatch, detail):
+    few_id, = add_users(portal, 1, publications=1, patents=1, commercializations=1)
+    many_id, = add_users(portal, 1, publications=40, patents=40, commercializations=40)
+    admin_client.get(f"/admin/users/{few_id}/{detail}")  # warm the field definition cache
+
+    few = dashboard_statements(portal, admin_client, monkeypatch, f"/admin/users/{few_id}/{detail}")
+    many = dashboard_statements(portal, admin_client, monkeypatch, f"/admin/users/{many_id}/{detail}")
+
+    assert len(many) == len(few), "\n".join(["one row:"] + few + ["40 rows:"] + many)
+    assert len(admin_client.get(f"/admin/users/{many_id}/{detail}").get_json()) == 40
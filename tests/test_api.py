@@ -0,0 +1,139 @@
+# JSON API v1: argument validation (no MySQL) and, against the scratch
+# database, keyset pagination and If-None-Match / 304 on lists.
+import pytest
+
+from conftest import add_users
+
+PATENT_FIELDS = {"patent_status": {"field_name": "patent_status", "orig_type": "text",
+                                   "storage": "json", "is_searchable": True}}
+
+
+def api_error(portal, fn, *args, **kwargs):
+    with pytest.raises(portal.APIError) as exc:
+        fn(*args, **kwargs)
+    return exc.value.status, str(exc.value)
+
+
+def test_fields_default_to_every_column(app_module):
+    spec = app_module.API_RESOURCES["patents"]
+    with app_module.app.test_request_context("/api/v1/patents"):
+        assert app_module.api_fields(spec, PATENT_FIELDS) == spec["columns"] + ["patent_status"]
+
+
+def test_fields_always_include_id_once(app_module):
+    spec = app_module.API_RESOURCES["publications"]
+    with app_module.app.test_request_context("/api/v1/publications?fields=title, year,title,id"):
+        assert app_module.api_fields(spec, {}) == ["id", "title", "year"]
+    with app_module.app.test_request_context("/api/v1/patents?fields=patent_status"):
+        assert app_module.api_fields(app_module.API_RESOURCES["patents"], PATENT_FIELDS) == \
+               ["id", "patent_status"]
+
+
+def test_unknown_fields_are_a_400(app_module):
+    spec = app_module.API_RESOURCES["publications"]
+    with app_module.app.test_request_context("/api/v1/publications?fields=title,password,email"):
+        assert api_error(app_module, app_module.api_fields, spec, {}) == \
+               (400, "Unknown fields: password, email")
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", None),
+    ("limit=", None),
+    ("limit=20", 20),
+    ("limit=100000", 500),  # clamped to the maximum
+])
+def test_int_arg(app_module, query, expected):
+    with app_module.app.test_request_context(f"/api/v1/publications?{query}"):
+        assert app_module.api_int_arg("limit", minimum=1, maximum=500) == expected
+
+
+@pytest.mark.parametrize("query, message", [
+    ("limit=ten", "'limit' must be an integer"),
+    ("limit=1.5", "'limit' must be an integer"),
+    ("limit=0", "'limit' must be at least 1"),
+])
+def test_int_arg_errors(app_module, query, message):
+    with app_module.app.test_request_context(f"/api/v1/publications?{query}"):
+        assert api_error(app_module, app_module.api_int_arg, "limit", minimum=1, maximum=500) == \
+               (400, message)
+
+
+def test_write_values(app_module):
+    spec = app_module.API_RESOURCES["publications"]
+    values = app_module.api_write_values("publications", spec, {},
+                                         {"title": " A Title ", "year": "2019 (in press)"}, True)
+    assert values["title"] == "A Title"
+    assert values["title_hash"] == app_module.title_hash("a title")
+    assert values["pub_year"] == 2019
+
+    assert api_error(app_module, app_module.api_write_values, "publications", spec, {},
+                     {"title": "x", "pub_year": 2019}, True) == \
+           (400, "Unknown or read-only fields: pub_year")
+    assert api_error(app_module, app_module.api_write_values, "publications", spec, {},
+                     {"authors": "x"}, True) == (400, "'title' is required")
+    assert api_error(app_module, app_module.api_write_values, "publications", spec, {},
+                     {"title": ["x"]}, False) == (400, "'title' must be a string")
+
+
+class VersionCursor:
+    def __init__(self, version):
+        self.version = version
+
+    def execute(self, sql, params):
+        pass
+
+    def fetchone(self):
+        return None if self.version is None else {"data_version": self.version}
+
+
+def test_list_etag_follows_data_version_and_args(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "get_schema_versions", lambda: {"patents": 3})
+
+    def etag(url, version):
+        with app_module.app.test_request_context(url):
+            return app_module.api_list_etag("patents", 7, VersionCursor(version))
+
+    base = etag("/api/v1/patents?limit=5&fields=title", 1)
+    assert base == etag("/api/v1/patents?fields=title&limit=5", 1)  # argument order doesn't matter
+    assert base != etag("/api/v1/patents?limit=5&fields=title", 2)
+    assert base != etag("/api/v1/patents?limit=6&fields=title", 1)
+    assert etag("/api/v1/patents", None) is None  # no counters yet: no version ETag
+
+
+@pytest.fixture
+def user_client(portal):
+    user_id, = add_users(portal, 1, publications=5, patents=0, commercializations=0)
+    client = portal.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+        sess["role"] = "user"
+    return client
+
+
+@pytest.mark.db
+def test_keyset_pagination(user_client):
+    seen, url = [], "/api/v1/publications?limit=2&fields=title"
+    while url:
+        body = user_client.get(url).get_json()
+        assert len(body["data"]) <= 2
+        assert all(set(row) == {"id", "title"} for row in body["data"])
+        seen += [row["id"] for row in body["data"]]
+        url = body["next"]
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)  # newest first, no row twice
+
+
+@pytest.mark.db
+def test_unchanged_list_is_a_304(user_client):
+    first = user_client.get("/api/v1/publications?limit=10")
+    etag = first.headers["ETag"]
+
+    again = user_client.get("/api/v1/publications?limit=10", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    created = user_client.post("/api/v1/publications", json={"title": "Brand new"})
+    assert created.status_code == 201
+    changed = user_client.get("/api/v1/publications?limit=10", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["data"][0]["title"] == "Brand new"
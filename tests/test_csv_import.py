@@ -0,0 +1,134 @@
+# CSV import validation: per-type column validators, header mapping and the
+# error report. No MySQL: dynamic fields and the connection are faked.
+import io
+
+import pytest
+
+PATENT_FIELDS = [
+    {"field_name": "patent_number", "field_label": "Patent Number", "orig_type": "text",
+     "is_required": True, "storage": "column"},
+    {"field_name": "filed_date", "field_label": "Filed On", "orig_type": "date",
+     "is_required": False, "storage": "column"},
+    {"field_name": "granted", "field_label": "Granted?", "orig_type": "checkbox",
+     "is_required": False, "storage": "json"},
+]
+
+
+@pytest.fixture
+def portal(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "get_dynamic_fields",
+                        lambda table, map_for_form=True: [dict(f) for f in PATENT_FIELDS]
+                        if table == "patents" else [])
+    return app_module
+
+
+def test_numbers(portal):
+    values, errors = portal.validate_import_column(["12", " 7 ", "", "1.5", "abc"], "int", False, None)
+    assert values == [12, 7, None, None, None]
+    assert errors == {3: "'1.5' is not a number", 4: "'abc' is not a number"}
+
+    values, errors = portal.validate_import_column(["1.5", "-2", "x"], "float", False, None)
+    assert values[:2] == [1.5, -2.0]
+    assert errors == {2: "'x' is not a number"}
+
+
+def test_dates(portal):
+    values, errors = portal.validate_import_column(
+        ["2024-02-29", "2023-02-29", "29/02/2024", ""], "date", False, None)
+    assert values[0] == "2024-02-29"
+    assert errors == {1: "'2023-02-29' is not a date (YYYY-MM-DD)",
+                      2: "'29/02/2024' is not a date (YYYY-MM-DD)"}
+
+
+def test_yes_no_values(portal):
+    raw = ["yes", "Y", "TRUE", "on", "1", "no", "n", "False", "off", "0", "", "maybe"]
+    values, errors = portal.validate_import_column(raw, "bool", False, None)
+    assert values == [1] * 5 + [0] * 6 + [0]
+    assert errors == {11: "'maybe' is not a yes/no value"}
+
+
+def test_length_limit(portal):
+    values, errors = portal.validate_import_column(["x" * 16, "x" * 17], "text", False, 16)
+    assert values == ["x" * 16, "x" * 17]
+    assert errors == {1: "longer than 16 characters"}
+
+
+def test_required(portal):
+    values, errors = portal.validate_import_column(["a", "", "   "], "text", True, 255)
+    assert values == ["a", None, None]
+    assert errors == {1: "is required", 2: "is required"}
+
+
+def test_header_maps_names_labels_and_user(portal):
+    columns = portal.import_columns("patents")
+    header = ["User_Email", "Title", "patent number", "Filed On", "granted", "Notes", ""]
+    mapping, user_key, ignored = portal.import_header_map(header, columns, "patents")
+
+    assert user_key == ("email", 0)
+    assert mapping == {"title": 1, "patent_number": 2, "filed_date": 3, "granted": 4}
+    assert ignored == ["Notes"]  # unknown headers are reported, blank ones dropped
+
+
+def test_header_prefers_email_over_user_id(portal):
+    columns = portal.import_columns("commercializations")
+    mapping, user_key, _ = portal.import_header_map(["user_id", "email", "project_name"],
+                                                     columns, "commercializations")
+    assert user_key == ("email", 1)
+
+
+def test_header_errors(portal):
+    columns = portal.import_columns("patents")
+    with pytest.raises(portal.CSVImportError, match="user_email or user_id"):
+        portal.import_header_map(["title", "patent_number"], columns, "patents")
+    with pytest.raises(portal.CSVImportError, match="Missing required columns: patent_number"):
+        portal.import_header_map(["user_id", "title"], columns, "patents")
+
+
+def test_import_columns_types_dynamic_fields(portal):
+    columns = portal.import_columns("patents")
+    assert columns[-3:] == [("patent_number", "text", True, 255),
+                            ("filed_date", "date", False, None),
+                            ("granted", "bool", False, None)]
+
+
+class NoUsersConnection:
+    """Stands in for a connection to a database where no user matches."""
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def fetchall(self):
+        return []
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_error_report_is_capped(portal, monkeypatch):
+    monkeypatch.setattr(portal, "get_db", NoUsersConnection)
+    rows = portal.IMPORT_MAX_REPORTED_ERRORS + 5
+    csv_text = "user_email,project_name,notes\n" + "".join(
+        f"nobody{i}@example.com,Project {i},x\n" for i in range(rows))
+
+    report = portal.import_csv("commercializations", io.StringIO(csv_text), chunk_size=300)
+
+    assert report["rows"] == rows
+    assert report["inserted"] == 0
+    assert report["failed"] == rows
+    assert len(report["errors"]) == portal.IMPORT_MAX_REPORTED_ERRORS
+    assert report["errors_truncated"]
+    assert report["errors"][0] == {"row": 2, "errors": ["user nobody0@example.com not found"]}
+    assert report["ignored_columns"] == ["notes"]
+
+
+def test_unknown_table_and_empty_file(portal):
+    with pytest.raises(portal.CSVImportError, match="Unknown table"):
+        portal.import_csv("users_new", io.StringIO("user_id\n1\n"))
+    with pytest.raises(portal.CSVImportError, match="empty"):
+        portal.import_csv("patents", io.StringIO(""))
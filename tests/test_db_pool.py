@@ -0,0 +1,183 @@
+# Unit tests for the connection pool, with a stub connect callable (no MySQL).
+import threading
+import time
+
+import pytest
+
+mysql_connector = pytest.importorskip("mysql.connector")
+
+from db_pool import ConnectionPool, PooledConnection, PoolTimeout  # noqa: E402
+
+
+class StubConnection:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+        self.ping_fails = False
+        self.rollback_fails = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if self.ping_fails:
+            raise mysql_connector.errors.InterfaceError("gone away")
+
+    def rollback(self):
+        if self.rollback_fails:
+            raise mysql_connector.errors.OperationalError("lost connection")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class StubConnect:
+    def __init__(self):
+        self.made = []
+
+    def __call__(self, **kwargs):
+        conn = StubConnection(len(self.made))
+        self.made.append(conn)
+        return conn
+
+
+def make_pool(**kwargs):
+    options = dict(pool_size=2, max_overflow=1, pool_timeout=0.1, pool_recycle=3600)
+    options.update(kwargs)
+    connect = StubConnect()
+    return ConnectionPool({"host": "stub"}, connect=connect, **options), connect
+
+
+def test_idle_connections_are_reused_most_recent_first():
+    pool, connect = make_pool()
+    a = pool.acquire()
+    b = pool.acquire()
+    pool.release(*a)
+    pool.release(*b)
+
+    assert pool.acquire()[0] is b[0]
+    assert pool.acquire()[0] is a[0]
+    assert len(connect.made) == 2
+    assert b[0].rollbacks == 1  # released connections never carry a transaction over
+
+
+def test_pool_timeout_when_exhausted():
+    pool, _ = make_pool(pool_size=1, max_overflow=0, pool_timeout=0.05)
+    pool.acquire()
+    start = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert time.monotonic() - start >= 0.05
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["waits"], stats["open"]) == (1, 1, 1)
+
+
+def test_waiter_gets_a_released_connection():
+    pool, connect = make_pool(pool_size=1, max_overflow=0, pool_timeout=2)
+    held = pool.acquire()
+    threading.Timer(0.05, pool.release, held).start()
+
+    assert pool.acquire()[0] is held[0]
+    assert len(connect.made) == 1
+    assert pool.stats()["wait_time_total"] > 0
+
+
+def test_overflow_connections_are_closed_on_release():
+    pool, connect = make_pool(pool_size=1, max_overflow=1)
+    a = pool.acquire()
+    b = pool.acquire()  # overflow
+    pool.release(*a)
+    pool.release(*b)
+
+    assert not a[0].closed
+    assert b[0].closed
+    stats = pool.stats()
+    assert (stats["open"], stats["idle"]) == (1, 1)
+
+
+def test_connections_past_recycle_age_are_replaced():
+    pool, connect = make_pool(pool_recycle=0.05)
+    old = pool.acquire()
+    pool.release(*old)
+    time.sleep(0.1)
+
+    new = pool.acquire()
+    assert new[0] is not old[0]
+    assert old[0].closed
+    assert pool.stats()["recycled"] == 1
+    assert pool.stats()["open"] == 1
+
+
+def test_failed_ping_replaces_the_connection():
+    pool, connect = make_pool()
+    dead = pool.acquire()
+    pool.release(*dead)
+    dead[0].ping_fails = True
+
+    fresh = pool.acquire()
+    assert fresh[0] is not dead[0]
+    assert dead[0].closed
+    assert pool.stats()["invalidated"] == 1
+
+
+def test_failed_rollback_on_release_discards_the_connection():
+    pool, connect = make_pool()
+    conn = pool.acquire()
+    conn[0].rollback_fails = True
+    pool.release(*conn)
+
+    assert conn[0].closed
+    stats = pool.stats()
+    assert (stats["open"], stats["idle"], stats["invalidated"]) == (0, 0, 1)
+
+
+def test_connect_error_frees_the_slot():
+    def refuse(**kwargs):
+        raise mysql_connector.errors.InterfaceError("refused")
+
+    pool = ConnectionPool({}, pool_size=1, max_overflow=0, pool_timeout=0.05, connect=refuse)
+    for _ in range(3):
+        with pytest.raises(mysql_connector.errors.InterfaceError):
+            pool.acquire()
+    assert pool.stats()["open"] == 0
+
+
+def test_double_close_returns_the_connection_once():
+    pool, connect = make_pool(pool_size=2, max_overflow=0)
+    conn = PooledConnection(pool, *pool.acquire())
+    conn.close()
+    conn.close()
+
+    assert pool.stats()["idle"] == 1
+    first, second = pool.acquire(), pool.acquire()
+    assert first[0] is not second[0]
+
+
+def test_request_bound_close_is_a_no_op_until_release():
+    pool, connect = make_pool()
+    conn = PooledConnection(pool, *pool.acquire(), request_bound=True)
+    conn.close()
+    assert pool.stats()["checked_out"] == 1
+
+    conn.release()
+    assert pool.stats()["checked_out"] == 0
+
+
+def test_cursor_wrapper_is_applied():
+    class Conn(StubConnection):
+        def cursor(self, **kwargs):
+            return ("cursor", kwargs)
+
+    pool = ConnectionPool({}, connect=lambda **kwargs: Conn(0))
+    conn = PooledConnection(pool, *pool.acquire(), cursor_wrapper=lambda c: ("wrapped", c))
+    assert conn.cursor(dictionary=True) == ("wrapped", ("cursor", {"dictionary": True}))
+    assert conn.n == 0  # everything else goes to the raw connection
+
+
+def test_dispose_closes_idle_connections():
+    pool, connect = make_pool()
+    a, b = pool.acquire(), pool.acquire()
+    pool.release(*a)
+    pool.dispose()
+
+    assert a[0].closed and not b[0].closed
+    assert pool.stats()["open"] == 1
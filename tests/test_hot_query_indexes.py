@@ -0,0 +1,89 @@
+# EXPLAIN each hot lookup from app.py and check it is answered from the
+# index the migrations / ensure_base_tables() provide.
+import pytest
+
+from conftest import add_users
+
+pytestmark = pytest.mark.db
+
+
+@pytest.fixture(scope="module")
+def db(portal):
+    # enough rows that a per-user lookup is clearly cheaper through an index
+    user_ids = add_users(portal, 300, publications=5, patents=2, commercializations=2)
+    conn = portal.get_db()
+    cursor = conn.cursor(dictionary=True)
+    for table in ("users_new", "publications", "patents", "commercializations"):
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+    yield cursor, user_ids[len(user_ids) // 2]
+    cursor.close()
+    conn.close()
+
+
+def indexes_starting_with(cursor, table, columns):
+    """Names of the indexes on `table` whose leading columns are `columns`
+    (including auto-named FK and UNIQUE indexes)."""
+    cursor.execute("""
+        SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS cols
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        GROUP BY INDEX_NAME
+    """, (table,))
+    prefix = ",".join(columns)
+    return {row["INDEX_NAME"] for row in cursor.fetchall()
+            if row["cols"] == prefix or row["cols"].startswith(prefix + ",")}
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+    assert len(plan) == 1, plan
+    return plan[0]
+
+
+def test_publications_by_user_ordered_by_year(portal, db):
+    cursor, user_id = db
+    plan = explain(cursor, portal.ADMIN_DETAIL_QUERIES["publications"], (user_id,))
+    assert plan["key"] == "idx_publications_user_year", plan
+    assert "filesort" not in (plan["Extra"] or ""), plan
+
+
+def test_title_hash_dedupe_lookup(portal, db):
+    cursor, user_id = db
+    # the stored hashes the Scholar import diffs against
+    plan = explain(cursor, "SELECT id, title_hash, citations, scholar_pub_id FROM publications "
+                           "WHERE user_id=%s", (user_id,))
+    assert plan["key"] in indexes_starting_with(cursor, "publications", ["user_id"]), plan
+    # a single (user, title) match, as enforced on insert
+    plan = explain(cursor, "SELECT id FROM publications WHERE user_id=%s AND title_hash=%s",
+                   (user_id, portal.title_hash("Publication 1 of user 1")))
+    assert plan["key"] == "uq_publications_user_title_hash", plan
+
+
+def test_title_hash_is_unique_per_user(portal, db):
+    cursor, user_id = db
+    title = "Publication 1 of user 1"
+    cursor.execute("SELECT user_id FROM publications WHERE title_hash=%s LIMIT 1",
+                   (portal.title_hash(title),))
+    owner = cursor.fetchone()["user_id"]
+    with pytest.raises(portal.mysql.connector.Error) as exc:
+        cursor.execute("INSERT INTO publications (user_id, title, title_hash) VALUES (%s, %s, %s)",
+                       (owner, title.upper(), portal.title_hash(title.upper())))
+    assert portal.is_duplicate_entry(exc.value)
+
+
+def test_login_by_email(db):
+    cursor, _ = db
+    plan = explain(cursor, "SELECT * FROM users_new WHERE email=%s", ("user5@test.example",))
+    assert plan["key"] in indexes_starting_with(cursor, "users_new", ["email"]), plan
+
+
+@pytest.mark.parametrize("table", ["patents", "commercializations"])
+def test_children_by_user_newest_first(portal, db, table):
+    cursor, user_id = db
+    sql = portal.ADMIN_DETAIL_QUERIES[table].format(columns=portal.dynamic_select_sql(table, []))
+    plan = explain(cursor, sql, (user_id,))
+    assert plan["key"] in indexes_starting_with(cursor, table, ["user_id"]), plan
+    # InnoDB secondary indexes end with the primary key: (user_id, id) needs no sort
+    assert "filesort" not in (plan["Extra"] or ""), plan
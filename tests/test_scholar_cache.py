@@ -0,0 +1,148 @@
+# Offline tests for the Scholar lookup cache (SQLite file under tmp_path).
+import time
+
+import pytest
+
+from scholar_cache import CachedScholarBackend, MemoryScholarCache, ScholarCache
+from scholar_fetch import FakeScholarly, ScholarFetcher
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ScholarCache(str(tmp_path / "scholar" / "cache.sqlite3"))
+
+
+class CountingBackend(FakeScholarly):
+    """FakeScholarly that counts calls per kind and can fail a set of fills."""
+
+    def __init__(self, num_publications=5, failing=()):
+        super().__init__(num_publications=num_publications, latency=0, failure_rate=0)
+        self.failing = set(failing)
+        self.author_lookups = self.list_fills = self.pub_fills = 0
+
+    def search_author_id(self, scholar_id):
+        self.author_lookups += 1
+        return super().search_author_id(scholar_id)
+
+    def fill(self, obj, sections=None):
+        if "scholar_id" in obj:
+            self.list_fills += 1
+        else:
+            self.pub_fills += 1
+            if obj["author_pub_id"] in self.failing:
+                raise ConnectionError("simulated Scholar failure")
+        return super().fill(obj, sections)
+
+
+def test_get_set_round_trip_and_persists(cache, tmp_path):
+    cache.set("pub:1", {"bib": {"title": "A"}, "num_citations": 3}, ttl=60)
+    assert cache.get("pub:1") == {"bib": {"title": "A"}, "num_citations": 3}
+
+    reopened = ScholarCache(cache.path)
+    assert reopened.get("pub:1") == {"bib": {"title": "A"}, "num_citations": 3}
+
+
+def test_entries_expire_after_ttl(cache):
+    cache.set("short", "value", ttl=0.05)
+    cache.set("long", "value", ttl=60)
+    time.sleep(0.1)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 1  # the expired row was deleted on read
+
+
+def test_least_recently_used_evicted_past_max_bytes(tmp_path):
+    cache = ScholarCache(str(tmp_path / "cache.sqlite3"))
+    value = "x" * 1000
+    for key in ("a", "b", "c"):
+        cache.set(key, value, ttl=60)
+        time.sleep(0.01)
+    size = cache.stats()["bytes"] // 3
+    cache.max_bytes = 3 * size
+
+    assert cache.get("a") == value  # a is now more recent than b
+    time.sleep(0.01)
+    cache.set("d", value, ttl=60)
+
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == [value] * 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+
+
+def test_expired_entries_are_evicted_first(tmp_path):
+    cache = ScholarCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("old", "x" * 1000, ttl=60)
+    cache.set("stale", "x" * 1000, ttl=0.01)
+    time.sleep(0.05)
+    cache.max_bytes = cache.stats()["bytes"]
+    cache.set("new", "x" * 1000, ttl=60)
+
+    assert cache.get("old") is not None
+    assert cache.stats()["evictions"] == 0  # dropping the expired entry was enough
+
+
+def test_hit_and_miss_counters(cache):
+    assert cache.get("missing") is None
+    cache.set("key", 1, ttl=60)
+    assert cache.get("key") == 1
+    assert cache.get("key") == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_memory_cache_expires_and_counts():
+    cache = MemoryScholarCache()
+    cache.set("short", 1, ttl=0.05)
+    assert cache.get("short") == 1
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 0)
+
+
+def test_backend_answers_repeat_lookups_from_cache(cache):
+    backend = CountingBackend()
+    cached = CachedScholarBackend(backend, cache)
+    fetcher = ScholarFetcher(cached, workers=2, rate=1000, burst=1000, retries=0)
+
+    first = fetcher.fetch_author("abc")
+    second = fetcher.fetch_author("abc")
+
+    assert [p["author_pub_id"] for p in second.publications] == \
+           [p["author_pub_id"] for p in first.publications]
+    assert (backend.author_lookups, backend.list_fills, backend.pub_fills) == (1, 1, 5)
+
+
+def test_publication_list_has_its_own_short_ttl(cache):
+    backend = CountingBackend()
+    cached = CachedScholarBackend(backend, cache, author_ttl=0.05, pub_ttl=60)
+    fetcher = ScholarFetcher(cached, workers=2, rate=1000, burst=1000, retries=0)
+
+    fetcher.fetch_author("abc")
+    time.sleep(0.1)
+    fetcher.fetch_author("abc")
+
+    # the list (citation counts) is fetched again, filled publications are not
+    assert (backend.author_lookups, backend.list_fills, backend.pub_fills) == (2, 2, 5)
+
+
+def test_failed_fills_are_not_cached(cache):
+    backend = CountingBackend(failing={"abc:1", "abc:3"})
+    cached = CachedScholarBackend(backend, cache)
+    fetcher = ScholarFetcher(cached, workers=2, rate=1000, burst=1000, retries=0)
+
+    first = fetcher.fetch_author("abc")
+    assert (len(first.publications), first.failed) == (3, 2)
+    assert cache.get("pub:abc:1") is None
+
+    backend.failing.clear()
+    second = fetcher.fetch_author("abc")
+    assert (len(second.publications), second.failed) == (5, 0)
+    assert backend.pub_fills == 5 + 2  # only the two failures are retried
@@ -0,0 +1,171 @@
+# Offline tests for the Scholar fetch engine, against FakeScholarly and a few
+# scripted backends (no network, no MySQL).
+import random
+import threading
+import time
+
+import pytest
+
+from scholar_fetch import FakeScholarly, ScholarFetcher, TokenBucket
+
+
+class RecordingBackend(FakeScholarly):
+    """FakeScholarly without failures that notes when each call started."""
+
+    def __init__(self, **kwargs):
+        super().__init__(failure_rate=0, **kwargs)
+        self.started = []
+
+    def _simulate(self):
+        with self._lock:
+            self.started.append(time.monotonic())
+        super()._simulate()
+
+
+class FlakyBackend(FakeScholarly):
+    """Each publication's fill() raises `failures[i]` times before it works."""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(num_publications=len(failures), latency=0, failure_rate=0, **kwargs)
+        self.failures = dict(enumerate(failures))
+        self.attempts = {}
+
+    def fill(self, obj, sections=None):
+        if "scholar_id" in obj:
+            return super().fill(obj, sections)
+        i = int(obj["author_pub_id"].split(":")[1])
+        with self._lock:
+            self.attempts[i] = self.attempts.get(i, 0) + 1
+            fail = self.failures[i] > 0
+            self.failures[i] -= 1
+        if fail:
+            raise ConnectionError("transient")
+        return super().fill(obj, sections)
+
+
+def fetcher(backend, **kwargs):
+    options = dict(workers=4, rate=1000, burst=1000, retries=3, backoff=0.001, max_backoff=0.01,
+                   deadline=10, heartbeat=1)
+    options.update(kwargs)
+    return ScholarFetcher(backend, **options)
+
+
+def test_token_bucket_allows_burst_then_rate():
+    bucket = TokenBucket(rate=100, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        assert bucket.acquire()
+    assert time.monotonic() - start < 0.02
+    assert bucket.acquire()
+    assert time.monotonic() - start >= 0.009
+
+
+def test_token_bucket_gives_up_past_deadline():
+    bucket = TokenBucket(rate=1, burst=1)
+    assert bucket.acquire()
+    assert not bucket.acquire(deadline=time.monotonic() + 0.1)
+
+
+def test_rate_limit_is_shared_by_all_workers():
+    rate, burst = 40, 2
+    backend = RecordingBackend(num_publications=20, latency=0)
+    result = fetcher(backend, workers=8, rate=rate, burst=burst).fetch_author("abc")
+
+    assert len(result.publications) == 20
+    started = sorted(backend.started)
+    assert len(started) == 22  # author lookup + publication list + 20 fills
+    for n, t in enumerate(started, 1):
+        # n calls can't start before the bucket has produced n tokens
+        assert t - started[0] >= (n - burst) / rate - 0.005, (n, t - started[0])
+
+
+def test_transient_errors_are_retried():
+    backend = FlakyBackend([0, 1, 3, 2])
+    result = fetcher(backend, retries=3).fetch_author("abc")
+
+    assert result.complete
+    assert result.failed == 0
+    assert [p["author_pub_id"] for p in result.publications] == ["abc:0", "abc:1", "abc:2", "abc:3"]
+    assert backend.attempts == {0: 1, 1: 2, 2: 4, 3: 3}
+
+
+def test_publication_fails_once_retries_run_out():
+    backend = FlakyBackend([0, 5, 0])
+    result = fetcher(backend, retries=2).fetch_author("abc")
+
+    assert result.complete
+    assert result.failed == 1
+    assert [p["author_pub_id"] for p in result.publications] == ["abc:0", "abc:2"]
+    assert backend.attempts[1] == 3
+
+
+def test_backoff_grows_between_retries():
+    backend = FlakyBackend([3])
+    start = time.monotonic()
+    result = fetcher(backend, retries=3, backoff=0.04, max_backoff=1).fetch_author("abc")
+
+    assert result.failed == 0
+    # jittered to 50-100% of 0.04 + 0.08 + 0.16
+    assert time.monotonic() - start >= 0.5 * (0.04 + 0.08 + 0.16)
+
+
+def test_author_lookup_error_is_raised():
+    backend = FakeScholarly(latency=0, failure_rate=1.0)
+    with pytest.raises(ConnectionError):
+        fetcher(backend, retries=1).fetch_author("abc")
+
+
+def test_deadline_returns_partial_results():
+    backend = FakeScholarly(num_publications=40, latency=0.05, failure_rate=0)
+    start = time.monotonic()
+    result = fetcher(backend, workers=2, deadline=0.4).fetch_author("abc")
+
+    assert time.monotonic() - start < 1.0
+    assert not result.complete
+    assert 0 < len(result.publications) < 40
+    assert result.failed == 0
+
+
+def test_filled_and_failed_counts():
+    num, failure_rate = 30, 0.2
+    # FakeScholarly draws one random number per call; with no retries the
+    # draws after the two author calls decide which fills fail
+    seed = next(s for s in range(100)
+                if all(random.Random(s).random() >= failure_rate for _ in range(2)))
+    draws = random.Random(seed)
+    failures = [draws.random() < failure_rate for _ in range(2 + num)][2:]
+    assert 0 < sum(failures) < num
+
+    backend = FakeScholarly(num_publications=num, latency=0.001, failure_rate=failure_rate, seed=seed)
+    result = fetcher(backend, retries=0).fetch_author("abc")
+
+    assert result.complete
+    assert result.failed == sum(failures)
+    assert len(result.publications) == num - sum(failures)
+    assert all(p["filled"] for p in result.publications)
+
+
+def test_pubs_filter_limits_fills():
+    backend = FakeScholarly(num_publications=10, latency=0, failure_rate=0)
+    result = fetcher(backend).fetch_author("abc", pubs_filter=lambda pubs: pubs[:3])
+
+    assert [p["author_pub_id"] for p in result.publications] == ["abc:0", "abc:1", "abc:2"]
+    assert backend.calls == 2 + 3
+
+
+def test_on_progress_heartbeat():
+    beats = []
+    main_thread = threading.current_thread()
+
+    def on_progress(filled):
+        assert threading.current_thread() is main_thread
+        beats.append(filled)
+
+    backend = FakeScholarly(num_publications=20, latency=0.02, failure_rate=0)
+    result = fetcher(backend, workers=2, heartbeat=0.03).fetch_author("abc", on_progress=on_progress)
+
+    assert len(result.publications) == 20
+    assert beats[:2] == [0, 0]  # after the author lookup and the publication list
+    assert beats == sorted(beats)
+    assert beats[-1] == 20
+    assert len(beats) >= 5  # ~0.2s of fills, at least one beat per 0.03s
@@ -0,0 +1,135 @@
+# Unit tests for the SQL instrumentation helpers (pure Python, no MySQL).
+import pytest
+
+from sql_metrics import InstrumentedCursor, RequestQueries, SQLStats, normalize_sql, percentile
+
+
+def queries(*seconds):
+    q = RequestQueries()
+    for s in seconds:
+        q.add("SELECT 1", s)
+    return q
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT *  FROM users_new\n   WHERE id = %s", "SELECT * FROM users_new WHERE id = ?"),
+    ("SELECT * FROM t WHERE name = 'o\\'brien' AND n = 42", "SELECT * FROM t WHERE name = ? AND n = ?"),
+    ("SELECT * FROM t2 WHERE id IN (%s, %s, %s)", "SELECT * FROM t2 WHERE id IN (?...)"),
+    ("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)", "INSERT INTO t (a, b) VALUES (?...), ..."),
+    (b"SELECT 1", "SELECT ?"),
+])
+def test_normalize_sql(statement, expected):
+    assert normalize_sql(statement) == expected
+
+
+def test_normalize_sql_groups_variants():
+    assert normalize_sql("DELETE FROM p WHERE id IN (%s, %s)") == \
+           normalize_sql("DELETE FROM p WHERE id IN (%s, %s, %s, %s)")
+
+
+def test_normalize_sql_truncates():
+    assert len(normalize_sql("SELECT " + ", ".join(f"col_{i}" for i in range(500)))) == 500
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 51  # nearest rank on the 0..n-1 scale
+    assert percentile(values, 95) == 95
+    assert percentile(values, 0) == 1
+    assert percentile(values, 100) == 100
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_request_queries_keeps_slowest():
+    q = RequestQueries(keep=2)
+    for statement, seconds in [("a", 0.1), ("b", 0.5), ("c", 0.2), ("d", 0.05)]:
+        q.add(statement, seconds)
+    assert q.count == 4
+    assert q.total == pytest.approx(0.85)
+    assert q.slowest == [(0.5, "b"), (0.2, "c")]
+
+
+def test_route_percentiles():
+    stats = SQLStats()
+    for n in range(1, 21):
+        stats.record_request("user_dashboard", queries(*([0.001] * n)))
+    route = stats.snapshot()["routes"]["user_dashboard"]
+    assert route["requests"] == 20
+    assert route["queries"] == sum(range(1, 21))
+    assert (route["queries_p50"], route["queries_p95"]) == (11, 19)
+
+
+def test_samples_window_is_bounded():
+    stats = SQLStats(samples=5)
+    for n in range(1, 11):
+        stats.record_request("home", queries(*([0.001] * n)))
+    route = stats.snapshot()["routes"]["home"]
+    assert route["requests"] == 10
+    assert route["queries_p50"] == 8  # only the last 5 requests (6..10) are sampled
+
+
+def test_routes_past_the_cap_pool_under_other():
+    stats = SQLStats(max_routes=2)
+    for route in ("a", "b", "c", "d", "a"):
+        stats.record_request(route, queries(0.01))
+    routes = stats.snapshot()["routes"]
+    assert set(routes) == {"a", "b", "(other)"}
+    assert routes["a"]["requests"] == 2
+    assert routes["(other)"]["requests"] == 2
+
+
+def test_statements_past_the_cap_pool_under_other():
+    stats = SQLStats(max_statements=2)
+    for table in ("a", "b", "c", "d"):
+        stats.record_statement(f"SELECT * FROM {table} WHERE id = %s", 0.001)
+    stats.record_statement("SELECT * FROM a WHERE id = 7", 0.003)
+    statements = {s["statement"]: s for s in stats.snapshot()["statements"]}
+    assert set(statements) == {"SELECT * FROM a WHERE id = ?", "SELECT * FROM b WHERE id = ?", "(other)"}
+    assert statements["SELECT * FROM a WHERE id = ?"]["calls"] == 2
+    assert statements["(other)"]["calls"] == 2
+
+
+def test_statements_sorted_by_total_time_and_limited():
+    stats = SQLStats()
+    stats.record_statement("SELECT a", 0.001)
+    stats.record_statement("SELECT b", 0.010)
+    stats.record_statement("SELECT c", 0.005)
+    rows = stats.snapshot(top=2)["statements"]
+    assert [r["statement"] for r in rows] == ["SELECT b", "SELECT c"]
+    assert rows[0]["total_ms"] == pytest.approx(10.0)
+
+
+def test_reset():
+    stats = SQLStats()
+    stats.record_statement("SELECT 1", 0.001)
+    stats.record_request("home", queries(0.001))
+    stats.reset()
+    assert stats.snapshot() == {"routes": {}, "statements": []}
+
+
+class FakeCursor:
+    rowcount = 3
+
+    def execute(self, operation, params=None):
+        if operation == "FAIL":
+            raise RuntimeError("boom")
+
+    def executemany(self, operation, seq_params):
+        pass
+
+    def __iter__(self):
+        return iter([(1,), (2,)])
+
+
+def test_instrumented_cursor_reports_every_call():
+    seen = []
+    cursor = InstrumentedCursor(FakeCursor(), lambda statement, seconds: seen.append(statement))
+    cursor.execute("SELECT 1")
+    cursor.executemany("INSERT INTO t VALUES (%s)", [(1,), (2,)])
+    with pytest.raises(RuntimeError):
+        cursor.execute("FAIL")  # failed statements are timed too
+
+    assert seen == ["SELECT 1", "INSERT INTO t VALUES (%s)", "FAIL"]
+    assert cursor.rowcount == 3
+    assert list(cursor) == [(1,), (2,)]